@@ -30,6 +30,13 @@ class Mode(Enum):
 # Read-only modes that generate advisory output and never touch git state.
 READ_ONLY_MODES = (Mode.EXPLAIN, Mode.SPLIT, Mode.CHANGELOG, Mode.RELEASE)
 
+# Mode groups shared by the option-compatibility rules in ``validate_options``.
+_COMMIT_MODES = frozenset({Mode.COMMIT, Mode.AMEND})
+_NO_LLM_MODES = frozenset({Mode.INIT, Mode.LIST, Mode.UPDATE})
+_CONTEXT_MODES = frozenset(
+    {Mode.COMMIT, Mode.AMEND, Mode.SQUASH, Mode.PR, *READ_ONLY_MODES}
+)
+
 
 def resolve_mode(
     *,
@@ -49,21 +56,22 @@ def resolve_mode(
     """
     Resolves the operational mode based on the provided flags.
     """
-    flags = [
-        amend,
-        changelog,
-        check,
-        explain,
-        init,
-        list_flag,
-        pr,
-        release,
-        split,
-        squash,
-        stats,
-        update,
-    ]
-    if sum(flags) > 1:
+    flags = (
+        (amend, Mode.AMEND),
+        (changelog, Mode.CHANGELOG),
+        (check, Mode.CHECK),
+        (explain, Mode.EXPLAIN),
+        (init, Mode.INIT),
+        (list_flag, Mode.LIST),
+        (pr, Mode.PR),
+        (release, Mode.RELEASE),
+        (split, Mode.SPLIT),
+        (squash, Mode.SQUASH),
+        (stats, Mode.STATS),
+        (update, Mode.UPDATE),
+    )
+    selected = [mode for enabled, mode in flags if enabled]
+    if len(selected) > 1:
         typer.echo(
             "Error: mode flags (--amend, --changelog, --check, --explain, --init, "
             "--list, --PR, --release, --split, --squash, --stats, --update) "
@@ -72,32 +80,7 @@ def resolve_mode(
         )
         raise typer.Exit(code=1)
 
-    if amend:
-        return Mode.AMEND
-    if changelog:
-        return Mode.CHANGELOG
-    if check:
-        return Mode.CHECK
-    if explain:
-        return Mode.EXPLAIN
-    if init:
-        return Mode.INIT
-    if list_flag:
-        return Mode.LIST
-    if pr:
-        return Mode.PR
-    if release:
-        return Mode.RELEASE
-    if split:
-        return Mode.SPLIT
-    if squash:
-        return Mode.SQUASH
-    if stats:
-        return Mode.STATS
-    if update:
-        return Mode.UPDATE
-
-    return Mode.COMMIT
+    return selected[0] if selected else Mode.COMMIT
 
 
 def validate_options(
@@ -118,68 +101,39 @@ def validate_options(
     """
     Validates the combination of command-line options provided by the user.
     """
-    if enable_debug and (help_flag or version_flag):
-        typer.echo(
-            "Error: --debug cannot be used with --help or --version.",
-            err=True,
-        )
-        raise typer.Exit(code=1)
-
-    if stage_tracked and mode not in (Mode.COMMIT, Mode.AMEND):
-        typer.echo(
-            "Error: --all can only be used in COMMIT or AMEND mode.",
-            err=True,
-        )
-        raise typer.Exit(code=1)
-
-    if (provider_override or model_override) and mode in (
-        Mode.INIT,
-        Mode.LIST,
-        Mode.UPDATE,
-    ):
-        typer.echo(
-            "Error: --provider/--model cannot be used with --init, --list, or --update.",
-            err=True,
-        )
-        raise typer.Exit(code=1)
-
-    if time_flag and mode in (Mode.INIT, Mode.LIST, Mode.UPDATE):
-        typer.echo(
-            "Error: --time cannot be used with --init, --list, or --update.",
-            err=True,
-        )
-        raise typer.Exit(code=1)
-
-    if context and mode not in (
-        Mode.COMMIT,
-        Mode.AMEND,
-        Mode.SQUASH,
-        Mode.PR,
-        *READ_ONLY_MODES,
-    ):
-        typer.echo(
-            "Error: --context cannot be used with this mode.",
-            err=True,
-        )
-        raise typer.Exit(code=1)
-
-    if files and mode not in (Mode.COMMIT, Mode.AMEND):
-        typer.echo(
-            "Error: --files can only be used in COMMIT or AMEND mode.",
-            err=True,
-        )
-        raise typer.Exit(code=1)
-
-    if print_only:
-        if mode not in (Mode.COMMIT, Mode.AMEND):
-            typer.echo(
-                "Error: --print can only be used in COMMIT or AMEND mode.",
-                err=True,
-            )
-            raise typer.Exit(code=1)
-        if crazy:
-            typer.echo(
-                "Error: --print and --crazy are mutually exclusive.",
-                err=True,
-            )
+    violations = (
+        (
+            enable_debug and (help_flag or version_flag),
+            "--debug cannot be used with --help or --version.",
+        ),
+        (
+            stage_tracked and mode not in _COMMIT_MODES,
+            "--all can only be used in COMMIT or AMEND mode.",
+        ),
+        (
+            bool(provider_override or model_override) and mode in _NO_LLM_MODES,
+            "--provider/--model cannot be used with --init, --list, or --update.",
+        ),
+        (
+            time_flag and mode in _NO_LLM_MODES,
+            "--time cannot be used with --init, --list, or --update.",
+        ),
+        (
+            bool(context) and mode not in _CONTEXT_MODES,
+            "--context cannot be used with this mode.",
+        ),
+        (
+            bool(files) and mode not in _COMMIT_MODES,
+            "--files can only be used in COMMIT or AMEND mode.",
+        ),
+        (
+            print_only and mode not in _COMMIT_MODES,
+            "--print can only be used in COMMIT or AMEND mode.",
+        ),
+        (print_only and crazy, "--print and --crazy are mutually exclusive."),
+    )
+    # First violated rule wins, so order matters.
+    for violated, message in violations:
+        if violated:
+            typer.echo(f"Error: {message}", err=True)
             raise typer.Exit(code=1)
@@ -51,6 +51,7 @@ DEFAULT_CONFIG: dict[str, Any] = {
         "temperature": 0,
         "timeout": 300,
         "startup_timeout": 8,
+        "stream": False,
     },
     "language": "en",
     "default": "groq",
@@ -81,6 +82,7 @@ DEFAULT_CONFIG: dict[str, Any] = {
     "signoff": False,
     "secret_scan": True,
     "secret_scan_exclude": [],
+    "response_cache": False,
 }
 
 # Config keys holding a path to a prompt file. They share the same handling:
@@ -502,6 +504,7 @@ def ordered_default_config(
         "signoff",
         "secret_scan",
         "secret_scan_exclude",
+        "response_cache",
     ]
 
     ordered: dict[str, Any] = {}
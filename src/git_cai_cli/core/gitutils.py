@@ -2,6 +2,7 @@
 Check git repo and run git diff
 """
 
+import functools
 import hashlib
 import logging
 import os
@@ -186,10 +187,21 @@ def _editor_executable(argv: list[str]) -> str:
     return os.path.splitext(exe)[0]
 
 
-def find_git_root(
-    run_cmd: Callable[..., subprocess.CompletedProcess] = subprocess.run,
+@functools.lru_cache(maxsize=8)
+def _git_root_for_cwd(cwd: str) -> Path | None:
+    """Memoized ``git rev-parse --show-toplevel`` for one working directory.
+
+    Config loading and the mode handlers each ask for the repo root, so a
+    single run would otherwise spawn ``git`` several times for the same
+    answer. Keyed on the working directory so a ``chdir`` is never served a
+    stale root.
+    """
+    return _query_git_root(subprocess.run)
+
+
+def _query_git_root(
+    run_cmd: Callable[..., subprocess.CompletedProcess],
 ) -> Path | None:
-    """Returns the root directory of the current Git repository, or None if not in a Git repo."""
     try:
         result = run_cmd(
             ["git", "rev-parse", "--show-toplevel"],
@@ -202,6 +214,21 @@ def find_git_root(
         return None
 
 
+def find_git_root(
+    run_cmd: Callable[..., subprocess.CompletedProcess] | None = None,
+) -> Path | None:
+    """Returns the root directory of the current Git repository, or None if not in a Git repo.
+
+    Only the default runner is memoized; an injected ``run_cmd`` is always called.
+    """
+    if run_cmd is None:
+        try:
+            return _git_root_for_cwd(os.getcwd())
+        except OSError:
+            pass  # working directory vanished; let git report it
+    return _query_git_root(run_cmd or subprocess.run)
+
+
 def get_git_identity(
     run_cmd: Callable[..., subprocess.CompletedProcess] = subprocess.run,
 ) -> tuple[str, str]:
@@ -212,20 +239,26 @@ def get_git_identity(
     ``Signed-off-by:`` trailer.
     """
 
-    def _query(key: str) -> str:
-        try:
-            result = run_cmd(
-                ["git", "config", "--get", key],
-                capture_output=True,
-                text=True,
-                check=False,
-            )
-        except (FileNotFoundError, OSError) as exc:
-            raise RuntimeError("Git is not available on PATH.") from exc
-        return (result.stdout or "").strip()
-
-    name = _query("user.name")
-    email = _query("user.email")
+    # One ``git config`` process for both keys instead of one per key.
+    try:
+        result = run_cmd(
+            ["git", "config", "--get-regexp", r"^user\.(name|email)$"],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except (FileNotFoundError, OSError) as exc:
+        raise RuntimeError("Git is not available on PATH.") from exc
+
+    # Lines are ``<key> <value>``; later entries override earlier ones,
+    # matching ``git config --get``.
+    values: dict[str, str] = {}
+    for line in (result.stdout or "").splitlines():
+        key, _, value = line.partition(" ")
+        values[key] = value.strip()
+
+    name = values.get("user.name", "")
+    email = values.get("user.email", "")
     if not name or not email:
         raise RuntimeError("--signoff requires git user.name and user.email to be set.")
     return name, email
@@ -312,6 +345,29 @@ def append_to_caiignore(repo_root: Path, path: str) -> Path:
     return ignore_file
 
 
+_GLOB_CHARS = frozenset("*?[")
+
+
+def _exclude_pathspec(pattern: str) -> str:
+    """Translate a `.caiignore` pattern into an exclude pathspec.
+
+    A plain directory entry (``build/``, ``node_modules/``) becomes a
+    root-anchored glob over the whole subtree so git can skip the directory
+    outright instead of filtering every file beneath it. Anything else,
+    including wildcard directories whose match depth would change under
+    ``glob`` magic, keeps the plain ``:!`` form.
+    """
+    name = pattern.lstrip("/")
+    if (
+        pattern.endswith("/")
+        and not pattern.startswith("!")
+        and name.rstrip("/")
+        and not _GLOB_CHARS.intersection(name)
+    ):
+        return f":(exclude,glob,top){name}**"
+    return f":!{pattern}"
+
+
 def git_diff_excluding(
     repo_root: Path,
     run_cmd: Callable[..., subprocess.CompletedProcess] = subprocess.run,
@@ -326,7 +382,7 @@ def git_diff_excluding(
         cmd.extend(files)
     else:
         cmd.append(".")
-    cmd.extend(f":!{pattern}" for pattern in exclude_files)
+    cmd.extend(_exclude_pathspec(pattern) for pattern in exclude_files)
 
     result = run_cmd(cmd, capture_output=True, text=True, check=False)
     if result.returncode != 0:
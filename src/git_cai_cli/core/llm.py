@@ -3,20 +3,23 @@ Use LLMs to generate git commit messages from diffs or multiple commits.
 """
 
 import functools
+import json
 import logging
 import os
 import re
 import shutil
 import signal
+import socket
+import stat
 import subprocess
 import sys
 import time
-from collections.abc import Callable
 from pathlib import Path
 from typing import Any, Dict
 from urllib.parse import urlparse
 
 import requests
+from git_cai_cli.core import response_cache
 from git_cai_cli.core.config import CONFIG_DIR
 from git_cai_cli.core.gitutils import classify_changed_paths, paths_from_diff
 from git_cai_cli.core.languages import LANGUAGE_MAP
@@ -35,6 +38,19 @@ from urllib3.util.retry import Retry
 
 log = logging.getLogger(__name__)
 
+# Provider settings that shape the model's answer; all of them go into the
+# response-cache key so changing one never returns a stale cached reply.
+_CACHE_KEY_SETTINGS = (
+    "model",
+    "temperature",
+    "max_tokens",
+    "max_output_tokens",
+    "num_ctx",
+)
+
+
+# Hosts where git-cai may autostart ``ollama serve`` and probe it by TCP.
+_LOOPBACK_HOSTS = ("localhost", "127.0.0.1", "::1")
 
 # Models that reject any non-default ``temperature`` (return HTTP 400).
 # Extend this list as new restricted models appear.
@@ -84,6 +100,14 @@ OPENAI_COMPATIBLE_URLS = {
 _RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
 _RETRY_TOTAL = 3
 _RETRY_BACKOFF_FACTOR = 0.5
+# Keep-alive pool sizing: a handful of provider hosts, and enough sockets
+# per host that concurrent calls reuse connections instead of discarding them.
+_POOL_CONNECTIONS = 4
+_POOL_MAXSIZE = 16
+# Seconds to wait for the TCP/TLS handshake. Kept short and separate from the
+# configured read timeout so an unreachable host fails fast while slow token
+# generation still gets the full ``timeout``.
+_CONNECT_TIMEOUT = 3.05
 
 
 def _build_retrying_session() -> requests.Session:
@@ -92,7 +116,8 @@ def _build_retrying_session() -> requests.Session:
     Retries idempotent and POST requests on 429 + 5xx with exponential
     backoff. ``raise_for_status`` is still required at the call site so
     final non-retried failures surface as ``requests.HTTPError`` for the
-    central error classifier in ``validate.py``.
+    central error classifier in ``validate.py``. Connections are kept
+    alive, so repeated provider calls skip the TCP and TLS handshakes.
     """
     retry = Retry(
         total=_RETRY_TOTAL,
@@ -102,7 +127,11 @@ def _build_retrying_session() -> requests.Session:
         raise_on_status=False,
         respect_retry_after_header=True,
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = HTTPAdapter(
+        pool_connections=_POOL_CONNECTIONS,
+        pool_maxsize=_POOL_MAXSIZE,
+        max_retries=retry,
+    )
     session = requests.Session()
     # http:// adapter is required for local Ollama (http://localhost:11434).
     session.mount(
@@ -123,7 +152,7 @@ def _get_http_session() -> requests.Session:
     return _build_retrying_session()
 
 
-def _http_post(*args, **kwargs):
+def _http_post(*args: Any, **kwargs: Any) -> requests.Response:
     """POST via the module-level retrying session.
 
     Single patch-point for tests; never uses ``requests.post`` directly so
@@ -133,6 +162,24 @@ def _http_post(*args, **kwargs):
     return _get_http_session().post(*args, **kwargs)
 
 
+@functools.lru_cache(maxsize=32)
+def _read_prompt_cached(path: str, mtime_ns: int, size: int) -> str:
+    """Read and strip a prompt file. ``mtime_ns`` and ``size`` are part of
+    the cache key so an edited file is re-read."""
+    return Path(path).read_text(encoding="utf-8").strip()
+
+
+def _read_prompt(path: Path) -> str | None:
+    """Return the stripped prompt at ``path``, or None if it isn't a file."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return _read_prompt_cached(str(path), st.st_mtime_ns, st.st_size)
+
+
 def load_prompt_file(
     config_key: str,
     config: Dict[str, Any],
@@ -166,13 +213,13 @@ def load_prompt_file(
         if not path.is_absolute():
             path = path.resolve()
 
-        if path.is_file():
+        content = _read_prompt(path)
+        if content is not None:
             log.info(
                 "Loading prompt from user-defined file: %s (config key: '%s')",
                 path,
                 config_key,
             )
-            content = path.read_text(encoding="utf-8").strip()
             log.debug("User prompt loaded (%d characters).", len(content))
             return content
 
@@ -185,8 +232,8 @@ def load_prompt_file(
     # 2) Try global config directory (~/.config/cai/)
     log.info("No local prompt file configured for '%s'.", config_key)
     global_path = CONFIG_DIR / default_filename
-    if global_path.is_file():
-        content = global_path.read_text(encoding="utf-8").strip()
+    content = _read_prompt(global_path)
+    if content is not None:
         log.info(
             "Loading prompt from default file: %s",
             global_path,
@@ -202,6 +249,40 @@ def load_prompt_file(
     return hardcoded_fallback
 
 
+def _collect_ollama_stream(response: requests.Response) -> dict[str, Any]:
+    """Fold Ollama's newline-delimited JSON chunks into one /api/chat reply.
+
+    Each chunk carries a piece of ``message.content``; the final one
+    (``"done": true``) also carries the token counts. The response is
+    always closed so an aborted stream releases its pooled connection.
+    """
+    parts: list[str] = []
+    data: dict[str, Any] = {}
+    try:
+        for line in response.iter_lines():
+            if not line:
+                continue
+            try:
+                chunk = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(
+                    f"Invalid streamed response from Ollama: {line[:200]!r}"
+                ) from exc
+            if not isinstance(chunk, dict):
+                continue
+            if chunk.get("error"):
+                raise ValueError(f"Ollama request failed ({chunk['error']}).")
+            message = chunk.get("message")
+            if isinstance(message, dict):
+                parts.append(str(message.get("content", "")))
+            if chunk.get("done"):
+                data = chunk
+    finally:
+        response.close()
+    data["message"] = {"content": "".join(parts)}
+    return data
+
+
 class CommitMessageGenerator:
     """
     Generates git commit messages from diffs or from multiple commit messages.
@@ -266,6 +347,10 @@ class CommitMessageGenerator:
 
         return 300 if provider == "ollama" else 30
 
+    def _request_timeout(self, provider: str) -> tuple[float, int]:
+        """``(connect, read)`` timeout pair passed to requests."""
+        return (_CONNECT_TIMEOUT, self._timeout(provider))
+
     _PROMPT_FILE_KEY_BY_KIND: Dict[str, str] = {
         "commit": "prompt_file",
         "amend": "prompt_file",
@@ -581,6 +666,12 @@ class CommitMessageGenerator:
         ]
         return self._with_context("\n".join(sections), context), prompt
 
+    _EMOJI_ON = (
+        "Use relevant emojis at the start of the headline and in bullet points "
+        "where they add clarity. Keep emojis purposeful — one per bullet at most."
+    )
+    _EMOJI_OFF = "Do not use any emojis in the commit message."
+
     def _emoji_instruction(self) -> str:
         """
         Returns an emoji instruction string, or empty string if emoji is set to "none".
@@ -596,15 +687,10 @@ class CommitMessageGenerator:
             return ""
 
         if emoji_value:
-            emoji_instruction = (
-                "Use relevant emojis at the start of the headline and in bullet points "
-                "where they add clarity. Keep emojis purposeful — one per bullet at most."
-            )
             log.info("Emojis are enabled for commit messages.")
-        else:
-            emoji_instruction = "Do not use any emojis in the commit message."
-            log.info("Emojis are disabled for commit messages.")
-        return emoji_instruction
+            return self._EMOJI_ON
+        log.info("Emojis are disabled for commit messages.")
+        return self._EMOJI_OFF
 
     def _language_instruction(self) -> str:
         """
@@ -919,6 +1005,15 @@ class CommitMessageGenerator:
         if findings:
             raise SecretLeakError(findings)
 
+    # Provider name -> generation method name. OpenAI-compatible providers
+    # share one implementation that additionally takes the provider name.
+    _DISPATCH: Dict[str, str] = {
+        **dict.fromkeys(OPENAI_COMPATIBLE_URLS, "generate_openai_compatible"),
+        "gemini": "generate_gemini",
+        "anthropic": "generate_anthropic",
+        "ollama": "generate_ollama",
+    }
+
     def _dispatch_generate(self, content: str, system_prompt: str) -> str:
         """
         Route to the right provider. ``system_prompt`` comes from the
@@ -926,24 +1021,43 @@ class CommitMessageGenerator:
         """
         self._scan_for_secrets(content)
 
-        model_dispatch: Dict[str, Callable[..., str]] = {
-            "gemini": self.generate_gemini,
-            "anthropic": self.generate_anthropic,
-            "ollama": self.generate_ollama,
-        }
-
         provider = self.default_model
-        if provider not in OPENAI_COMPATIBLE_URLS and provider not in model_dispatch:
+        method_name = self._DISPATCH.get(provider)
+        if method_name is None:
             raise ValueError(f"Unknown model type: '{provider}'")
 
         log.debug("Using provider '%s' for generation.", provider)
 
-        if provider in OPENAI_COMPATIBLE_URLS:
-            return self.generate_openai_compatible(
-                content, provider, system_prompt_override=system_prompt
+        cache_key: str | None = None
+        if response_cache.is_enabled(self.config):
+            provider_block = self.config.get(provider) or {}
+            cache_key = response_cache.make_key(
+                provider,
+                *(str(provider_block.get(key, "")) for key in _CACHE_KEY_SETTINGS),
+                system_prompt,
+                content,
             )
+            start = time.perf_counter()
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                log.info("Using cached response (response_cache is enabled).")
+                # Record the hit like a provider call so record_elapsed
+                # patches this event, not the previous one.
+                self._last_latency_ms = int((time.perf_counter() - start) * 1000)
+                self._log_token_usage(provider, None, None)
+                return cached
+
+        # Resolved by name so instance-level overrides (and test patches)
+        # of the provider methods still take effect.
+        generate = getattr(self, method_name)
+        if provider in OPENAI_COMPATIBLE_URLS:
+            message = generate(content, provider, system_prompt_override=system_prompt)
+        else:
+            message = generate(content, system_prompt_override=system_prompt)
 
-        return model_dispatch[provider](content, system_prompt_override=system_prompt)
+        if cache_key is not None:
+            response_cache.put(cache_key, message)
+        return message
 
     # ---------------------------
     # MODEL CALLS
@@ -986,7 +1100,7 @@ class CommitMessageGenerator:
 
         start = time.perf_counter()
         response = _http_post(  # nosec B113
-            url, json=request, headers=headers, timeout=self._timeout(provider)
+            url, json=request, headers=headers, timeout=self._request_timeout(provider)
         )
         self._last_latency_ms = int((time.perf_counter() - start) * 1000)
         response.raise_for_status()
@@ -1056,7 +1170,10 @@ class CommitMessageGenerator:
 
         start = time.perf_counter()
         response = _http_post(  # nosec B113
-            url, json=request, headers=headers, timeout=self._timeout("anthropic")
+            url,
+            json=request,
+            headers=headers,
+            timeout=self._request_timeout("anthropic"),
         )
         self._last_latency_ms = int((time.perf_counter() - start) * 1000)
         response.raise_for_status()
@@ -1109,7 +1226,7 @@ class CommitMessageGenerator:
 
         start = time.perf_counter()
         response = _http_post(  # nosec B113
-            url, json=request, headers=headers, timeout=self._timeout("gemini")
+            url, json=request, headers=headers, timeout=self._request_timeout("gemini")
         )
         self._last_latency_ms = int((time.perf_counter() - start) * 1000)
         response.raise_for_status()
@@ -1147,15 +1264,33 @@ class CommitMessageGenerator:
         return host.rstrip("/")
 
     def _ollama_is_running(self) -> bool:
+        """Probe the Ollama endpoint.
+
+        On a loopback host a bare TCP connect is enough: ``ollama serve``
+        only binds its port once it can answer requests, and this keeps the
+        autostart poll loop free of per-iteration HTTP round trips. A
+        remote host may sit behind a proxy that accepts connections for any
+        backend, so there the probe still requires an HTTP 200 from the
+        Ollama API.
+        """
         base = self._ollama_base_url()
-        for path in ("/api/version", "/api/tags"):
-            try:
-                r = requests.get(f"{base}{path}", timeout=1)
-                if r.status_code == 200:
-                    return True
-            except requests.RequestException:
-                continue
-        return False
+        parsed = urlparse(base)
+        if parsed.hostname not in _LOOPBACK_HOSTS:
+            for path in ("/api/version", "/api/tags"):
+                try:
+                    r = requests.get(f"{base}{path}", timeout=1)
+                    if r.status_code == 200:
+                        return True
+                except requests.RequestException:
+                    continue
+            return False
+
+        try:
+            port = parsed.port or (443 if parsed.scheme == "https" else 80)
+            with socket.create_connection((parsed.hostname, port), timeout=1):
+                return True
+        except (OSError, ValueError):
+            return False
 
     def _start_ollama_server_if_needed(self) -> None:
         if self._ollama_is_running():
@@ -1164,7 +1299,7 @@ class CommitMessageGenerator:
         base = self._ollama_base_url()
         parsed = urlparse(base)
         hostname = parsed.hostname
-        if hostname not in ("localhost", "127.0.0.1", "::1"):
+        if hostname not in _LOOPBACK_HOSTS:
             raise ValueError(
                 f"Failed to reach Ollama at {base}. If you set OLLAMA_HOST to a remote host, ensure it is reachable."
             )
@@ -1281,23 +1416,29 @@ class CommitMessageGenerator:
         options: dict[str, Any] = {}
         if temperature is not None:
             options["temperature"] = temperature
+        # With ``ollama.stream: true`` the timeout bounds the gap between
+        # chunks rather than the whole generation, which suits slow local
+        # models on long diffs.
+        stream = bool(self.config["ollama"].get("stream", False))
         request: dict[str, Any] = {
             "model": model,
             "messages": messages,
-            "stream": False,
+            "stream": stream,
             "options": options,
         }
 
         start = time.perf_counter()
         try:
             response = _http_post(  # nosec B113
-                url, json=request, timeout=self._timeout("ollama")
+                url,
+                json=request,
+                timeout=self._request_timeout("ollama"),
+                stream=stream,
             )
         except requests.RequestException as exc:
             raise ValueError(
                 "Failed to reach Ollama. Ensure it is running (try: `ollama serve`)."
             ) from exc
-        self._last_latency_ms = int((time.perf_counter() - start) * 1000)
 
         try:
             response.raise_for_status()
@@ -1313,7 +1454,17 @@ class CommitMessageGenerator:
                 f"Ollama request failed with HTTP {response.status_code}{suffix}."
             ) from exc
 
-        data = response.json()
+        if stream:
+            try:
+                data = _collect_ollama_stream(response)
+            except requests.RequestException as exc:
+                raise ValueError(
+                    "Ollama stream was interrupted. Ensure it is running "
+                    "(try: `ollama serve`)."
+                ) from exc
+        else:
+            data = response.json()
+        self._last_latency_ms = int((time.perf_counter() - start) * 1000)
 
         # Extract token usage from Ollama response
         self._log_token_usage(
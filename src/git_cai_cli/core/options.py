@@ -2,9 +2,12 @@
 Core manager for CLI utilities.
 """
 
+import functools
 import logging
+import os
 import re
 import subprocess
+import sys
 from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
 
@@ -27,6 +30,8 @@ from git_cai_cli.core.languages import LANGUAGE_MAP
 
 log = logging.getLogger(__name__)
 
+_LEADING_DIGITS_RE = re.compile(r"\d+")
+
 
 def _parse_version(text: str) -> tuple[int, int, int]:
     """Return ``(major, minor, patch)`` for a version string.
@@ -42,7 +47,7 @@ def _parse_version(text: str) -> tuple[int, int, int]:
     core = text[1:] if text[:1].lower() == "v" else text
     numbers = []
     for part in core.split(".")[:3]:
-        match = re.match(r"\d+", part)
+        match = _LEADING_DIGITS_RE.match(part)
         numbers.append(int(match.group()) if match else 0)
     while len(numbers) < 3:
         numbers.append(0)
@@ -83,11 +88,16 @@ class CliManager:
             response = requests.get(
                 f"https://pypi.org/pypi/{self.package_name}/json", timeout=10
             )
-            latest_version = response.json()["info"]["version"]
+            latest_version = str(response.json()["info"]["version"])
         except requests.RequestException as e:
             log.error("Could not fetch version info from PyPI: %s", e)
             print("⚠️ Could not check for updates. Please try again later.")
             return
+        except (ValueError, KeyError, TypeError) as e:
+            # Not JSON, or no ``info.version`` (e.g. a proxy error page).
+            log.error("Unexpected version info from PyPI: %s", e)
+            print("⚠️ Could not check for updates. Please try again later.")
+            return
 
         # Compare only numeric parts
         installed_base = _parse_version(current_version)
@@ -101,6 +111,12 @@ class CliManager:
 
         print(f"⬆️  Update available: {current_version} → {latest_version}")
 
+        in_ci = os.environ.get("CI", "").lower() not in ("", "0", "false")
+        if not auto_confirm and (in_ci or not sys.stdin.isatty()):
+            # Nobody can answer the prompt (CI job, hook, piped stdin).
+            print(f"Run 'pipx upgrade {self.package_name}' to update.")
+            return
+
         if not auto_confirm:
             choice = (
                 input(
@@ -347,6 +363,11 @@ git cai -l style
         Print the list of supported languages and their human-readable names.
         Intended to be used in CLI commands.
         """
+        return self._languages_text
+
+    @functools.cached_property
+    def _languages_text(self) -> str:
+        """Rendered language list, built once per manager."""
         lines = ["\nAvailable languages:"]
         # Sort by the name (value)
         for code, name in sorted(
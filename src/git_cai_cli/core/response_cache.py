@@ -0,0 +1,122 @@
+"""Opt-in on-disk cache of LLM responses.
+
+Re-running git-cai on an unchanged diff (after aborting the editor, or
+when a hook re-invokes it) normally pays for a full provider round trip
+again. With ``response_cache: true`` in cai_config.yml, responses are
+stored in a SQLite DB under ``XDG_CACHE_HOME`` (default:
+``~/.cache/git-cai/responses.db``) keyed by a SHA-256 digest of the
+provider, model, temperature, system prompt and content. Only the digest
+and the generated text are stored — never the diff itself.
+
+The cache is off by default because re-running to get a *different*
+suggestion is a common workflow. Entries expire after ``TTL_SECONDS``.
+Like stats, the cache is best-effort: a failed read or write must never
+break generation.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+try:
+    import sqlite3
+except ImportError:  # minimal CPython builds may ship without _sqlite3
+    sqlite3 = None  # type: ignore[assignment]
+
+log = logging.getLogger(__name__)
+
+TTL_SECONDS = 7 * 24 * 60 * 60
+
+_CACHE_FAILURES: tuple[type[BaseException], ...] = (
+    (sqlite3.Error, OSError) if sqlite3 is not None else (OSError,)
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    response TEXT NOT NULL
+);
+"""
+
+
+def default_db_path() -> Path:
+    """Return the cache DB path under XDG_CACHE_HOME."""
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg) if xdg else Path.home() / ".cache"
+    return base / "git-cai" / "responses.db"
+
+
+def is_enabled(config: dict[str, Any] | None) -> bool:
+    """The cache is opt-in: ``response_cache: true`` at the top level."""
+    if not config or sqlite3 is None:
+        return False
+    return bool(config.get("response_cache", False))
+
+
+def make_key(*parts: str) -> str:
+    """Hash ``parts`` into a stable hex cache key.
+
+    Parts are NUL-separated so ``("ab", "c")`` and ``("a", "bc")`` never
+    collide.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@contextmanager
+def _connect(db_path: Path) -> Iterator[Any]:
+    if sqlite3 is None:
+        raise RuntimeError("sqlite3 unavailable; caller must gate on is_enabled()")
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path))
+    try:
+        conn.executescript(_SCHEMA)
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get(key: str, *, db_path: Path | None = None) -> str | None:
+    """Return the cached response for ``key``, or ``None`` on miss/expiry."""
+    path = db_path or default_db_path()
+    if not path.exists():
+        return None
+    try:
+        with _connect(path) as conn:
+            row = conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND created >= ?",
+                (key, time.time() - TTL_SECONDS),
+            ).fetchone()
+    except _CACHE_FAILURES as exc:
+        log.debug("Response cache read failed: %s", exc)
+        return None
+    return row[0] if row else None
+
+
+def put(key: str, response: str, *, db_path: Path | None = None) -> None:
+    """Store ``response`` under ``key`` and prune expired entries."""
+    path = db_path or default_db_path()
+    now = time.time()
+    try:
+        with _connect(path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, created, response) "
+                "VALUES (?, ?, ?)",
+                (key, now, response),
+            )
+            conn.execute(
+                "DELETE FROM responses WHERE created < ?", (now - TTL_SECONDS,)
+            )
+    except _CACHE_FAILURES as exc:
+        log.debug("Response cache write failed: %s", exc)
@@ -13,6 +13,20 @@ log = logging.getLogger(__name__)
 _AUTH_STATUS_CODES = frozenset({401, 403})
 _RATE_LIMIT_STATUS_CODES = frozenset({429})
 
+# Tone styles accepted by ``_validate_style`` (besides "none").
+ALLOWED_STYLES = frozenset(
+    {
+        "professional",
+        "neutral",
+        "friendly",
+        "funny",
+        "excited",
+        "sarcastic",
+        "apologetic",
+        "academic",
+    }
+)
+
 # Every top-level (non-provider) config key git-cai understands. Anything
 # here must also exist in ``DEFAULT_CONFIG`` so that ``git cai -g`` writes
 # it out; ``test_config.py`` asserts the two stay in sync.
@@ -47,6 +61,7 @@ ALLOWED_GLOBAL_KEYS = frozenset(
         "signoff",
         "secret_scan",
         "secret_scan_exclude",
+        "response_cache",
     }
 )
 
@@ -285,24 +300,13 @@ def _validate_style(style: str | None) -> str:
         If the style is empty or not in the allowed list.
     """
 
-    allowed_styles = {
-        "professional",
-        "neutral",
-        "friendly",
-        "funny",
-        "excited",
-        "sarcastic",
-        "apologetic",
-        "academic",
-    }
-
     if style is None:
         log.info("Style set to None — style instruction disabled in prompt.")
         return "none"
 
     if not style or not isinstance(style, str):
         raise ValueError(
-            f"Style must be a non-empty string. Allowed styles: {', '.join(sorted(allowed_styles))}, none"
+            f"Style must be a non-empty string. Allowed styles: {', '.join(sorted(ALLOWED_STYLES))}, none"
         )
 
     normalized = style.lower().strip()
@@ -311,9 +315,9 @@ def _validate_style(style: str | None) -> str:
         log.info("Style set to 'none' — style instruction disabled in prompt.")
         return "none"
 
-    if normalized not in allowed_styles:
+    if normalized not in ALLOWED_STYLES:
         raise ValueError(
-            f"Invalid style '{style}'. Allowed styles: {', '.join(sorted(allowed_styles))}, none"
+            f"Invalid style '{style}'. Allowed styles: {', '.join(sorted(ALLOWED_STYLES))}, none"
         )
 
     log.info("Using style: %s", normalized)
@@ -17,6 +17,7 @@ import subprocess
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pytest
 from git_cai_cli.core.gitutils import (
     append_to_caiignore,
     changed_files_range,
@@ -35,6 +36,8 @@ from git_cai_cli.core.gitutils import (
     truncate_diff,
 )
 
+pytestmark = pytest.mark.unit
+
 # ------------------------------------------------------------------------------
 # append_to_caiignore
 # ------------------------------------------------------------------------------
@@ -138,6 +141,57 @@ def test_find_git_root_failure_returns_none():
     assert find_git_root(run_cmd=fake_run) is None
 
 
+@pytest.fixture
+def clear_git_root_cache():
+    """Keeps the memoized repo root from leaking between tests."""
+    from git_cai_cli.core import gitutils
+
+    gitutils._git_root_for_cwd.cache_clear()
+    yield
+    gitutils._git_root_for_cwd.cache_clear()
+
+
+def test_find_git_root_default_runner_is_memoized_per_cwd(
+    tmp_path, monkeypatch, clear_git_root_cache
+):
+    """
+    The default runner spawns git once per working directory, not per call.
+    """
+    other = tmp_path / "other"
+    other.mkdir()
+    mock_proc = MagicMock()
+    mock_proc.stdout = "/fake/repo\n"
+
+    with patch(
+        "git_cai_cli.core.gitutils.subprocess.run", return_value=mock_proc
+    ) as run:
+        monkeypatch.chdir(tmp_path)
+        first = find_git_root()
+        second = find_git_root()
+        monkeypatch.chdir(other)
+        find_git_root()
+
+    assert first == second == Path("/fake/repo")
+    assert run.call_count == 2
+
+
+def test_find_git_root_injected_runner_is_never_cached(
+    tmp_path, monkeypatch, clear_git_root_cache
+):
+    """
+    A caller-supplied runner is invoked on every call, never served from the cache.
+    """
+    monkeypatch.chdir(tmp_path)
+    mock_proc = MagicMock()
+    mock_proc.stdout = "/fake/repo\n"
+    fake_run = MagicMock(return_value=mock_proc)
+
+    assert find_git_root(run_cmd=fake_run) == Path("/fake/repo")
+    assert find_git_root(run_cmd=fake_run) == Path("/fake/repo")
+
+    assert fake_run.call_count == 2
+
+
 # ------------------------------------------------------------------------------
 # get_current_branch
 # ------------------------------------------------------------------------------
@@ -181,7 +235,7 @@ def test_get_current_branch_not_in_repo():
 
 def test_git_diff_excluding_reads_ignore_file_and_excludes_patterns(tmp_path):
     """
-    git_diff_excluding() should append :!pattern for each line in .caiignore.
+    git_diff_excluding() should add an exclude pathspec for each line in .caiignore.
     """
     repo_root = tmp_path
     ignore_file = repo_root / ".caiignore"
@@ -194,13 +248,37 @@ def test_git_diff_excluding_reads_ignore_file_and_excludes_patterns(tmp_path):
     def fake_run(cmd, capture_output, text, check):
         # Ensure ignore patterns were added
         assert ":!*.pyc" in cmd
-        assert ":!build/" in cmd
+        assert ":(exclude,glob,top)build/**" in cmd
         return mock_proc
 
     output = git_diff_excluding(repo_root, run_cmd=fake_run)
     assert output == "diff output"
 
 
+def test_git_diff_excluding_prunes_plain_directories_at_root(tmp_path):
+    """
+    Plain directory patterns become root-anchored subtree globs; wildcard
+    and negated directory patterns keep the plain :! form.
+    """
+    (tmp_path / ".caiignore").write_text("node_modules/\n/dist/\n*.egg-info/\n!keep/\n")
+
+    captured_cmd = []
+
+    def fake_run(cmd, **kwargs):
+        captured_cmd.extend(cmd)
+        mock_proc = MagicMock()
+        mock_proc.returncode = 0
+        mock_proc.stdout = ""
+        return mock_proc
+
+    git_diff_excluding(tmp_path, run_cmd=fake_run)
+
+    assert ":(exclude,glob,top)node_modules/**" in captured_cmd
+    assert ":(exclude,glob,top)dist/**" in captured_cmd
+    assert ":!*.egg-info/" in captured_cmd
+    assert ":!!keep/" in captured_cmd
+
+
 def test_git_diff_excluding_exits_on_failure(tmp_path):
     """
     git_diff_excluding() should call exit_func(1) when diff returns error.
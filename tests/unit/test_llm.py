@@ -3,15 +3,27 @@ Unit tests for git_cai_cli.core.llm module.
 """
 
 import logging
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
+import requests
 from git_cai_cli.core.llm import (
     CommitMessageGenerator,
     _model_rejects_temperature,
     _resolve_temperature,
 )
 
+pytestmark = pytest.mark.unit
+
+
+def _mock_response(json_body):
+    """Successful provider response whose ``json()`` returns ``json_body``."""
+    response = Mock(spec=requests.Response)
+    response.status_code = 200
+    response.json.return_value = json_body
+    response.raise_for_status.return_value = None
+    return response
+
 
 # fixtures
 @pytest.fixture
@@ -33,6 +45,20 @@ def config():
     }
 
 
+@pytest.fixture(scope="module")
+def gen_factory():
+    """
+    Builds a CommitMessageGenerator for a given provider and config.
+    """
+
+    def _make(provider, config, *, token="fake-token"):
+        return CommitMessageGenerator(
+            token=token, config=config, default_model=provider
+        )
+
+    return _make
+
+
 @pytest.fixture
 def generator(config):
     """
@@ -125,6 +151,67 @@ def test_dispatch_valid_model(generator):
         mock_fn.assert_called_once()
 
 
+def test_dispatch_cache_hit_skips_provider(generator, monkeypatch, tmp_path):
+    """With ``response_cache`` on, an identical request is served from disk."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    generator.config["response_cache"] = True
+    with patch.object(
+        generator, "generate_openai_compatible", return_value="ok"
+    ) as mock_fn:
+        assert generator._dispatch_generate("diff", "prompt") == "ok"
+        assert generator._dispatch_generate("diff", "prompt") == "ok"
+        mock_fn.assert_called_once()
+
+        generator._dispatch_generate("other diff", "prompt")
+        assert mock_fn.call_count == 2
+
+
+def test_dispatch_cache_hit_records_its_own_stats_event(
+    generator, monkeypatch, tmp_path
+):
+    """A cache hit records a stats event so ``record_elapsed`` never patches
+    the previous call's row."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    generator.config["response_cache"] = True
+    with patch.object(generator, "generate_openai_compatible", return_value="ok"):
+        generator._dispatch_generate("diff", "prompt")
+    generator._last_latency_ms = 1234
+
+    with patch.object(generator, "_log_token_usage") as log_usage:
+        generator._dispatch_generate("diff", "prompt")
+
+    log_usage.assert_called_once_with("openai", None, None)
+    assert generator._last_latency_ms != 1234
+
+
+@pytest.mark.parametrize("setting", ["max_tokens", "max_output_tokens", "num_ctx"])
+def test_dispatch_cache_key_includes_output_settings(
+    generator, monkeypatch, tmp_path, setting
+):
+    """Changing a setting that shapes the answer must miss the cache."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    generator.config["response_cache"] = True
+    with patch.object(
+        generator, "generate_openai_compatible", return_value="ok"
+    ) as mock_fn:
+        generator._dispatch_generate("diff", "prompt")
+        generator.config["openai"][setting] = 512
+        generator._dispatch_generate("diff", "prompt")
+    assert mock_fn.call_count == 2
+
+
+def test_dispatch_cache_disabled_by_default(generator, monkeypatch, tmp_path):
+    """Without the opt-in every call reaches the provider."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    with patch.object(
+        generator, "generate_openai_compatible", return_value="ok"
+    ) as mock_fn:
+        generator._dispatch_generate("diff", "prompt")
+        generator._dispatch_generate("diff", "prompt")
+        assert mock_fn.call_count == 2
+    assert not (tmp_path / "git-cai").exists()
+
+
 def test_dispatch_invalid_model(generator):
     """
     Test that the _dispatch_generate method raises ValueError for unknown model
@@ -134,32 +221,12 @@ def test_dispatch_invalid_model(generator):
         generator._dispatch_generate("diff", "prompt")
 
 
-# test openai
-def test_generate_openai(generator):
-    """
-    Test that the OpenAI-compatible call returns the correct message text
-    """
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "  message text  "}}]
-    }
-
-    with patch(f"{CommitMessageGenerator.__module__}._http_post", mock_post):
-        result = generator.generate_openai_compatible(
-            "diff", "openai", system_prompt_override="sys"
-        )
-
-    assert result == "message text"
-    assert mock_post.call_args[0][0] == "https://api.openai.com/v1/chat/completions"
-
-
 def test_generate_openai_empty_content_raises(generator):
     """A null message content (empty/refused completion) must raise a clean
     ValueError instead of an AttributeError on .strip()."""
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": None}}]
-    }
+    mock_post = MagicMock(
+        return_value=_mock_response({"choices": [{"message": {"content": None}}]})
+    )
 
     with patch(f"{CommitMessageGenerator.__module__}._http_post", mock_post):
         with pytest.raises(ValueError, match="empty response"):
@@ -169,7 +236,7 @@ def test_generate_openai_empty_content_raises(generator):
 
 
 # test anthropic
-def test_generate_anthropic():
+def test_generate_anthropic(gen_factory):
     """
     Test that the generate_anthropic method returns the correct message text
     """
@@ -180,18 +247,13 @@ def test_generate_anthropic():
         }
     }
 
-    gen = CommitMessageGenerator(
-        token="fake-token",
-        config=config,
-        default_model="anthropic",
-    )
+    gen = gen_factory("anthropic", config)
 
     module_path = CommitMessageGenerator.__module__
 
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "content": [{"text": "   test   "}],
-    }
+    mock_post = MagicMock(
+        return_value=_mock_response({"content": [{"text": "   test   "}]})
+    )
 
     with patch(f"{module_path}._http_post", mock_post):
         result = gen.generate_anthropic("abc", system_prompt_override="sys")
@@ -206,7 +268,7 @@ def test_generate_anthropic():
     called_url = args[0]
     assert called_url == "https://api.anthropic.com/v1/messages"
 
-    assert kwargs["timeout"] == 30
+    assert kwargs["timeout"] == (3.05, 30)
 
     assert kwargs["headers"] == {
         "Content-Type": "application/json",
@@ -226,7 +288,7 @@ def test_generate_anthropic():
 
 
 # test gemini
-def test_generate_gemini():
+def test_generate_gemini(gen_factory):
     """
     Test that the generate_gemini method returns the correct message text
     """
@@ -237,18 +299,15 @@ def test_generate_gemini():
         }
     }
 
-    gen = CommitMessageGenerator(
-        token="fake-token",
-        config=config,
-        default_model="gemini",
-    )
+    gen = gen_factory("gemini", config)
 
     module_path = CommitMessageGenerator.__module__
 
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "candidates": [{"content": {"parts": [{"text": "   gemini text   "}]}}]
-    }
+    mock_post = MagicMock(
+        return_value=_mock_response(
+            {"candidates": [{"content": {"parts": [{"text": "   gemini text   "}]}}]}
+        )
+    )
 
     with patch(f"{module_path}._http_post", mock_post):
         result = gen.generate_gemini("abc", system_prompt_override="sys")
@@ -263,7 +322,7 @@ def test_generate_gemini():
         "models/gemini-3.1-flash-lite:generateContent"
     )
 
-    assert kwargs["timeout"] == 30
+    assert kwargs["timeout"] == (3.05, 30)
 
     assert kwargs["headers"] == {
         "Content-Type": "application/json",
@@ -278,166 +337,182 @@ def test_generate_gemini():
     }
 
 
-# test groq
-def test_generate_groq():
+# test OpenAI-compatible providers
+OPENAI_COMPATIBLE_FIXTURES = [
+    ("openai", "gpt-5.1", None, "https://api.openai.com/v1/chat/completions"),
+    ("deepseek", "deepseek-chat", 0.5, "https://api.deepseek.com/v1/chat/completions"),
+    (
+        "groq",
+        "llama-3.3-70b-versatile",
+        0.7,
+        "https://api.groq.com/openai/v1/chat/completions",
+    ),
+    (
+        "mistral",
+        "mistral-large-latest",
+        0.7,
+        "https://api.mistral.ai/v1/chat/completions",
+    ),
+    ("xai", "grok-4.3", 0.7, "https://api.x.ai/v1/chat/completions"),
+]
+
+
+@pytest.mark.parametrize(
+    "provider, model, temperature, url", OPENAI_COMPATIBLE_FIXTURES
+)
+def test_generate_openai_compatible_provider(
+    provider, model, temperature, url, gen_factory
+):
     """
-    Test that the generate_groq method returns the correct message text
+    Test that every OpenAI-compatible provider posts the shared request shape
+    to its own endpoint and returns the stripped message text
     """
-    config = {
-        "groq": {
-            "model": "llama-3.3-70b-versatile",
-            "temperature": 0.7,
-        }
-    }
+    provider_config: dict = {"model": model}
+    if temperature is not None:
+        provider_config["temperature"] = temperature
 
-    gen = CommitMessageGenerator(
-        token="fake-token",
-        config=config,
-        default_model="groq",
-    )
+    gen = gen_factory(provider, {provider: provider_config})
 
-    module_path = CommitMessageGenerator.__module__
-
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "   groq result   "}}]
-    }
+    mock_post = MagicMock(
+        return_value=_mock_response(
+            {"choices": [{"message": {"content": f"   {provider} result   "}}]}
+        )
+    )
 
-    with patch(f"{module_path}._http_post", mock_post):
+    with patch(f"{CommitMessageGenerator.__module__}._http_post", mock_post):
         result = gen.generate_openai_compatible(
-            "abc", "groq", system_prompt_override="sys"
+            "abc", provider, system_prompt_override="sys"
         )
 
-    assert result == "groq result"
+    assert result == f"{provider} result"
     mock_post.assert_called_once()
 
     args, kwargs = mock_post.call_args
 
-    assert args[0] == "https://api.groq.com/openai/v1/chat/completions"
+    assert args[0] == url
 
-    assert kwargs["timeout"] == 30
+    assert kwargs["timeout"] == (3.05, 30)
 
     assert kwargs["headers"] == {
         "Content-Type": "application/json",
         "Authorization": "Bearer fake-token",
     }
 
-    assert kwargs["json"] == {
-        "model": "llama-3.3-70b-versatile",
-        "temperature": 0.7,
+    expected_json: dict = {
+        "model": model,
         "messages": [
             {"role": "system", "content": "sys"},
             {"role": "user", "content": "abc"},
         ],
     }
+    if temperature is not None:
+        expected_json["temperature"] = temperature
+    assert kwargs["json"] == expected_json
 
 
-# test xai
-def test_generate_xai():
-    """
-    Test that the generate_xai method returns the correct message text
-    """
+def test_generate_ollama(gen_factory):
     config = {
-        "xai": {
-            "model": "grok-4.3",
-            "temperature": 0.7,
+        "ollama": {
+            "model": "llama3.1",
+            "temperature": 0.2,
         }
     }
 
-    gen = CommitMessageGenerator(
-        token="fake-token",
-        config=config,
-        default_model="xai",
-    )
+    gen = gen_factory("ollama", config, token=None)
 
     module_path = CommitMessageGenerator.__module__
 
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "   xai content   "}}]
-    }
+    mock_post = MagicMock(
+        return_value=_mock_response({"message": {"content": "   ollama text   "}})
+    )
 
-    with patch(f"{module_path}._http_post", mock_post):
-        result = gen.generate_openai_compatible(
-            "hello x", "xai", system_prompt_override="sys"
-        )
+    with (
+        patch.dict(f"{module_path}.os.environ", {}, clear=True),
+        patch(f"{module_path}.shutil.which", return_value="/usr/bin/ollama"),
+        patch(f"{module_path}.socket.create_connection"),
+        patch(f"{module_path}._http_post", mock_post),
+    ):
+        result = gen.generate_ollama("abc", system_prompt_override="sys")
 
-    assert result == "xai content"
+    assert result == "ollama text"
     mock_post.assert_called_once()
 
-    # --- Extract call details ---
     args, kwargs = mock_post.call_args
-
-    # Positional arg 0 = URL
-    called_url = args[0]
-    assert called_url == "https://api.x.ai/v1/chat/completions"
-
-    assert kwargs["timeout"] == 30
-
-    assert kwargs["headers"] == {
-        "Content-Type": "application/json",
-        "Authorization": "Bearer fake-token",
-    }
-
+    assert args[0] == "http://localhost:11434/api/chat"
+    assert kwargs["timeout"] == (3.05, 300)
     assert kwargs["json"] == {
-        "model": "grok-4.3",
-        "temperature": 0.7,
+        "model": "llama3.1",
         "messages": [
             {"role": "system", "content": "sys"},
-            {"role": "user", "content": "hello x"},
+            {"role": "user", "content": "abc"},
         ],
+        "stream": False,
+        "options": {"temperature": 0.2},
     }
 
 
-def test_generate_ollama():
+def test_generate_ollama_streaming(gen_factory, caplog):
     config = {
-        "ollama": {
-            "model": "llama3.1",
-            "temperature": 0.2,
-        }
+        "ollama": {"model": "llama3.1", "temperature": 0, "stream": True},
+        "token_logging": True,
     }
+    gen = gen_factory("ollama", config, token=None)
+    module_path = CommitMessageGenerator.__module__
 
-    gen = CommitMessageGenerator(
-        token=None,
-        config=config,
-        default_model="ollama",
-    )
+    mock_post = MagicMock()
+    mock_post.return_value.raise_for_status.return_value = None
+    mock_post.return_value.iter_lines.return_value = [
+        b'{"message": {"content": "  fix: "}, "done": false}',
+        b"",
+        b'{"message": {"content": "stream  "}, "done": false}',
+        b'{"message": {"content": ""}, "done": true,'
+        b' "prompt_eval_count": 7, "eval_count": 3}',
+    ]
 
+    with (
+        caplog.at_level(logging.INFO),
+        patch.dict(f"{module_path}.os.environ", {}, clear=True),
+        patch(f"{module_path}.shutil.which", return_value="/usr/bin/ollama"),
+        patch(f"{module_path}.socket.create_connection"),
+        patch(f"{module_path}._http_post", mock_post),
+    ):
+        assert gen.generate_ollama("abc", system_prompt_override="sys") == (
+            "fix: stream"
+        )
+
+    _, kwargs = mock_post.call_args
+    assert kwargs["stream"] is True
+    assert kwargs["json"]["stream"] is True
+    assert "Token usage [ollama]: prompt=7, completion=3, total=10" in caplog.text
+    mock_post.return_value.close.assert_called_once()
+
+
+def test_generate_ollama_streaming_rejects_malformed_line(gen_factory):
+    """A truncated NDJSON chunk raises a provider error and closes the stream."""
+    config = {"ollama": {"model": "llama3.1", "temperature": 0, "stream": True}}
+    gen = gen_factory("ollama", config, token=None)
     module_path = CommitMessageGenerator.__module__
 
     mock_post = MagicMock()
-    mock_post.return_value.status_code = 200
     mock_post.return_value.raise_for_status.return_value = None
-    mock_post.return_value.json.return_value = {
-        "message": {"content": "   ollama text   "},
-    }
+    mock_post.return_value.iter_lines.return_value = [
+        b'{"message": {"content": "fix: "}, "done": false}',
+        b'{"message": {"content": "trunc',
+    ]
 
     with (
         patch.dict(f"{module_path}.os.environ", {}, clear=True),
         patch(f"{module_path}.shutil.which", return_value="/usr/bin/ollama"),
-        patch(f"{module_path}.requests.get", return_value=MagicMock(status_code=200)),
+        patch(f"{module_path}.socket.create_connection"),
         patch(f"{module_path}._http_post", mock_post),
+        pytest.raises(ValueError, match="Invalid streamed response from Ollama"),
     ):
-        result = gen.generate_ollama("abc", system_prompt_override="sys")
+        gen.generate_ollama("abc", system_prompt_override="sys")
 
-    assert result == "ollama text"
-    mock_post.assert_called_once()
-
-    args, kwargs = mock_post.call_args
-    assert args[0] == "http://localhost:11434/api/chat"
-    assert kwargs["timeout"] == 300
-    assert kwargs["json"] == {
-        "model": "llama3.1",
-        "messages": [
-            {"role": "system", "content": "sys"},
-            {"role": "user", "content": "abc"},
-        ],
-        "stream": False,
-        "options": {"temperature": 0.2},
-    }
+    mock_post.return_value.close.assert_called_once()
 
 
-def test_generate_ollama_autostarts_and_stops_server():
+def test_generate_ollama_autostarts_and_stops_server(gen_factory):
     config = {
         "ollama": {
             "model": "llama3.1",
@@ -445,29 +520,14 @@ def test_generate_ollama_autostarts_and_stops_server():
         }
     }
 
-    gen = CommitMessageGenerator(
-        token=None,
-        config=config,
-        default_model="ollama",
-    )
+    gen = gen_factory("ollama", config, token=None)
 
     module_path = CommitMessageGenerator.__module__
 
-    # First _ollama_is_running() -> False (two calls), then True (one call)
-    mock_get = MagicMock(
-        side_effect=[
-            MagicMock(status_code=404),
-            MagicMock(status_code=404),
-            MagicMock(status_code=200),
-        ]
-    )
+    # First _ollama_is_running() -> refused, then accepted once started
+    mock_connect = MagicMock(side_effect=[ConnectionRefusedError(), MagicMock()])
 
-    mock_post = MagicMock()
-    mock_post.return_value.status_code = 200
-    mock_post.return_value.raise_for_status.return_value = None
-    mock_post.return_value.json.return_value = {
-        "message": {"content": "ok"},
-    }
+    mock_post = MagicMock(return_value=_mock_response({"message": {"content": "ok"}}))
 
     proc = MagicMock()
     proc.poll.return_value = None
@@ -476,7 +536,7 @@ def test_generate_ollama_autostarts_and_stops_server():
     with (
         patch.dict(f"{module_path}.os.environ", {}, clear=True),
         patch(f"{module_path}.shutil.which", return_value="/usr/bin/ollama"),
-        patch(f"{module_path}.requests.get", mock_get),
+        patch(f"{module_path}.socket.create_connection", mock_connect),
         patch(f"{module_path}._http_post", mock_post),
         patch(f"{module_path}.subprocess.Popen", return_value=proc) as popen,
         patch(f"{module_path}.os.killpg") as killpg,
@@ -488,50 +548,107 @@ def test_generate_ollama_autostarts_and_stops_server():
     killpg.assert_called_once()
 
 
+def test_ollama_is_running_probes_host_and_port(gen_factory):
+    gen = gen_factory("ollama", {"ollama": {"model": "llama3.1"}}, token=None)
+    module_path = CommitMessageGenerator.__module__
+
+    with (
+        patch.dict(f"{module_path}.os.environ", {"OLLAMA_HOST": "127.0.0.1:9999"}),
+        patch(f"{module_path}.socket.create_connection") as connect,
+    ):
+        assert gen._ollama_is_running() is True
+    connect.assert_called_once_with(("127.0.0.1", 9999), timeout=1)
+
+    with patch(
+        f"{module_path}.socket.create_connection",
+        side_effect=ConnectionRefusedError(),
+    ):
+        assert gen._ollama_is_running() is False
+
+
+def test_ollama_is_running_requires_http_ok_on_remote_host(gen_factory):
+    """A remote OLLAMA_HOST may be a proxy that accepts any connection, so
+    readiness there still means an HTTP 200 from the Ollama API."""
+    gen = gen_factory("ollama", {"ollama": {"model": "llama3.1"}}, token=None)
+    module_path = CommitMessageGenerator.__module__
+
+    with (
+        patch.dict(f"{module_path}.os.environ", {"OLLAMA_HOST": "gpu-box:11434"}),
+        patch(f"{module_path}.socket.create_connection") as connect,
+        patch(f"{module_path}.requests.get", return_value=Mock(status_code=502)) as get,
+    ):
+        assert gen._ollama_is_running() is False
+        get.return_value = Mock(status_code=200)
+        assert gen._ollama_is_running() is True
+
+    connect.assert_not_called()
+    get.assert_called_with("http://gpu-box:11434/api/version", timeout=1)
+
+
 # ---------------------------
 # Token usage logging tests
 # ---------------------------
 
 
-def test_token_usage_logged_openai(caplog):
-    """Verify token usage is logged for OpenAI when token_logging is enabled."""
+@pytest.mark.parametrize(
+    "provider, prompt_tokens, completion_tokens",
+    [("openai", 100, 50), ("groq", 120, 40), ("mistral", 110, 45)],
+)
+def test_token_usage_logged_openai_compatible(
+    caplog, provider, prompt_tokens, completion_tokens, gen_factory
+):
+    """Verify token usage is logged for OpenAI-compatible providers when
+    token_logging is enabled."""
     config = {
-        "openai": {"model": "gpt-5.1", "temperature": 0},
+        provider: {"model": "some-model", "temperature": 0},
         "token_logging": True,
     }
 
-    gen = CommitMessageGenerator(token="fake", config=config, default_model="openai")
+    gen = gen_factory(provider, config)
 
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "msg"}}],
-        "usage": {"prompt_tokens": 100, "completion_tokens": 50},
-    }
+    mock_post = MagicMock(
+        return_value=_mock_response(
+            {
+                "choices": [{"message": {"content": "msg"}}],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                },
+            }
+        )
+    )
 
     with caplog.at_level(logging.INFO):
         with patch(f"{CommitMessageGenerator.__module__}._http_post", mock_post):
             gen.generate_openai_compatible(
-                "diff", "openai", system_prompt_override="sys"
+                "diff", provider, system_prompt_override="sys"
             )
 
-    assert "Token usage [openai]: prompt=100, completion=50, total=150" in caplog.text
+    total = prompt_tokens + completion_tokens
+    assert (
+        f"Token usage [{provider}]: prompt={prompt_tokens}, "
+        f"completion={completion_tokens}, total={total}"
+    ) in caplog.text
 
 
-def test_token_usage_logged_anthropic(caplog):
+def test_token_usage_logged_anthropic(caplog, gen_factory):
     """Verify token usage is logged for Anthropic when token_logging is enabled."""
     config = {
         "anthropic": {"model": "claude-haiku-4-5", "temperature": 0},
         "token_logging": True,
     }
 
-    gen = CommitMessageGenerator(token="fake", config=config, default_model="anthropic")
+    gen = gen_factory("anthropic", config)
     module_path = CommitMessageGenerator.__module__
 
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "content": [{"text": "msg"}],
-        "usage": {"input_tokens": 200, "output_tokens": 80},
-    }
+    mock_post = MagicMock(
+        return_value=_mock_response(
+            {
+                "content": [{"text": "msg"}],
+                "usage": {"input_tokens": 200, "output_tokens": 80},
+            }
+        )
+    )
 
     with caplog.at_level(logging.INFO):
         with patch(f"{module_path}._http_post", mock_post):
@@ -542,21 +659,24 @@ def test_token_usage_logged_anthropic(caplog):
     )
 
 
-def test_token_usage_logged_gemini(caplog):
+def test_token_usage_logged_gemini(caplog, gen_factory):
     """Verify token usage is logged for Gemini with usageMetadata format."""
     config = {
         "gemini": {"model": "gemini-3.1-flash-lite", "temperature": 0},
         "token_logging": True,
     }
 
-    gen = CommitMessageGenerator(token="fake", config=config, default_model="gemini")
+    gen = gen_factory("gemini", config)
     module_path = CommitMessageGenerator.__module__
 
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "candidates": [{"content": {"parts": [{"text": "msg"}]}}],
-        "usageMetadata": {"promptTokenCount": 150, "candidatesTokenCount": 60},
-    }
+    mock_post = MagicMock(
+        return_value=_mock_response(
+            {
+                "candidates": [{"content": {"parts": [{"text": "msg"}]}}],
+                "usageMetadata": {"promptTokenCount": 150, "candidatesTokenCount": 60},
+            }
+        )
+    )
 
     with caplog.at_level(logging.INFO):
         with patch(f"{module_path}._http_post", mock_post):
@@ -565,56 +685,27 @@ def test_token_usage_logged_gemini(caplog):
     assert "Token usage [gemini]: prompt=150, completion=60, total=210" in caplog.text
 
 
-def test_token_usage_logged_groq(caplog):
-    """Verify token usage is logged for Groq (OpenAI-compatible format)."""
-    config = {
-        "groq": {"model": "llama-3.3-70b", "temperature": 0},
-        "token_logging": True,
-    }
-
-    gen = CommitMessageGenerator(token="fake", config=config, default_model="groq")
-    module_path = CommitMessageGenerator.__module__
-
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "msg"}}],
-        "usage": {"prompt_tokens": 120, "completion_tokens": 40},
-    }
-
-    with caplog.at_level(logging.INFO):
-        with patch(f"{module_path}._http_post", mock_post):
-            gen.generate_openai_compatible("diff", "groq", system_prompt_override="sys")
-
-    assert "Token usage [groq]: prompt=120, completion=40, total=160" in caplog.text
-
-
-def test_token_usage_logged_ollama(caplog):
+def test_token_usage_logged_ollama(caplog, gen_factory):
     """Verify token usage is logged for Ollama (eval_count format)."""
     config = {
         "ollama": {"model": "llama3.1", "temperature": 0},
         "token_logging": True,
     }
 
-    gen = CommitMessageGenerator(token=None, config=config, default_model="ollama")
+    gen = gen_factory("ollama", config, token=None)
     module_path = CommitMessageGenerator.__module__
 
-    mock_post = MagicMock()
-    mock_post.return_value.status_code = 200
-    mock_post.return_value.raise_for_status.return_value = None
-    mock_post.return_value.json.return_value = {
-        "message": {"content": "msg"},
-        "prompt_eval_count": 90,
-        "eval_count": 35,
-    }
+    mock_post = MagicMock(
+        return_value=_mock_response(
+            {"message": {"content": "msg"}, "prompt_eval_count": 90, "eval_count": 35}
+        )
+    )
 
     with caplog.at_level(logging.INFO):
         with (
             patch.dict(f"{module_path}.os.environ", {}, clear=True),
             patch(f"{module_path}.shutil.which", return_value="/usr/bin/ollama"),
-            patch(
-                f"{module_path}.requests.get",
-                return_value=MagicMock(status_code=200),
-            ),
+            patch(f"{module_path}.socket.create_connection"),
             patch(f"{module_path}._http_post", mock_post),
         ):
             gen.generate_ollama("diff", system_prompt_override="sys")
@@ -622,21 +713,20 @@ def test_token_usage_logged_ollama(caplog):
     assert "Token usage [ollama]: prompt=90, completion=35, total=125" in caplog.text
 
 
-def test_token_usage_not_available(caplog):
+def test_token_usage_not_available(caplog, gen_factory):
     """Verify debug log when token usage is not in API response."""
     config = {
         "groq": {"model": "llama-3.3-70b", "temperature": 0},
         "token_logging": True,
     }
 
-    gen = CommitMessageGenerator(token="fake", config=config, default_model="groq")
+    gen = gen_factory("groq", config)
     module_path = CommitMessageGenerator.__module__
 
-    mock_post = MagicMock()
     # Response without 'usage' key
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "msg"}}],
-    }
+    mock_post = MagicMock(
+        return_value=_mock_response({"choices": [{"message": {"content": "msg"}}]})
+    )
 
     with caplog.at_level(logging.DEBUG):
         with patch(f"{module_path}._http_post", mock_post):
@@ -645,21 +735,24 @@ def test_token_usage_not_available(caplog):
     assert "Token usage not available" in caplog.text
 
 
-def test_token_usage_disabled(caplog):
+def test_token_usage_disabled(caplog, gen_factory):
     """Verify no token logging when token_logging is disabled."""
     config = {
         "groq": {"model": "llama-3.3-70b", "temperature": 0},
         "token_logging": False,
     }
 
-    gen = CommitMessageGenerator(token="fake", config=config, default_model="groq")
+    gen = gen_factory("groq", config)
     module_path = CommitMessageGenerator.__module__
 
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "msg"}}],
-        "usage": {"prompt_tokens": 100, "completion_tokens": 50},
-    }
+    mock_post = MagicMock(
+        return_value=_mock_response(
+            {
+                "choices": [{"message": {"content": "msg"}}],
+                "usage": {"prompt_tokens": 100, "completion_tokens": 50},
+            }
+        )
+    )
 
     with caplog.at_level(logging.DEBUG):
         with patch(f"{module_path}._http_post", mock_post):
@@ -668,21 +761,24 @@ def test_token_usage_disabled(caplog):
     assert "Token usage" not in caplog.text
 
 
-def test_token_usage_disabled_when_key_missing(caplog):
+def test_token_usage_disabled_when_key_missing(caplog, gen_factory):
     """Verify token logging is disabled when token_logging key is not in config (backward compat)."""
     config = {
         "groq": {"model": "llama-3.3-70b", "temperature": 0},
         # token_logging key intentionally absent — simulating old config
     }
 
-    gen = CommitMessageGenerator(token="fake", config=config, default_model="groq")
+    gen = gen_factory("groq", config)
     module_path = CommitMessageGenerator.__module__
 
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "msg"}}],
-        "usage": {"prompt_tokens": 100, "completion_tokens": 50},
-    }
+    mock_post = MagicMock(
+        return_value=_mock_response(
+            {
+                "choices": [{"message": {"content": "msg"}}],
+                "usage": {"prompt_tokens": 100, "completion_tokens": 50},
+            }
+        )
+    )
 
     with caplog.at_level(logging.DEBUG):
         with patch(f"{module_path}._http_post", mock_post):
@@ -691,157 +787,20 @@ def test_token_usage_disabled_when_key_missing(caplog):
     assert "Token usage" not in caplog.text
 
 
-# ---------------------------
-# Tests for generate_mistral
-# ---------------------------
-
-
-def test_generate_mistral():
-    """Test that generate_mistral returns the correct message text."""
-    config = {
-        "mistral": {
-            "model": "mistral-large-latest",
-            "temperature": 0.7,
-        }
-    }
-
-    gen = CommitMessageGenerator(
-        token="fake-token",
-        config=config,
-        default_model="mistral",
-    )
-
-    module_path = CommitMessageGenerator.__module__
-
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "   mistral result   "}}]
-    }
-
-    with patch(f"{module_path}._http_post", mock_post):
-        result = gen.generate_openai_compatible(
-            "abc", "mistral", system_prompt_override="sys"
-        )
-
-    assert result == "mistral result"
-    mock_post.assert_called_once()
-
-    args, kwargs = mock_post.call_args
-
-    assert args[0] == "https://api.mistral.ai/v1/chat/completions"
-    assert kwargs["timeout"] == 30
-
-    assert kwargs["headers"] == {
-        "Content-Type": "application/json",
-        "Authorization": "Bearer fake-token",
-    }
-
-    assert kwargs["json"] == {
-        "model": "mistral-large-latest",
-        "temperature": 0.7,
-        "messages": [
-            {"role": "system", "content": "sys"},
-            {"role": "user", "content": "abc"},
-        ],
-    }
-
-
-def test_generate_mistral_raises_on_http_error():
-    """Test that generate_mistral raises on HTTP error via raise_for_status."""
-    import requests
-
-    config = {
-        "mistral": {
-            "model": "mistral-large-latest",
-            "temperature": 0.7,
-        }
-    }
-
-    gen = CommitMessageGenerator(
-        token="fake-token",
-        config=config,
-        default_model="mistral",
-    )
-
-    module_path = CommitMessageGenerator.__module__
-
-    mock_post = MagicMock()
-    mock_post.return_value.raise_for_status.side_effect = requests.HTTPError(
-        "401 Unauthorized"
-    )
-
-    with patch(f"{module_path}._http_post", mock_post):
-        with pytest.raises(requests.HTTPError):
-            gen.generate_openai_compatible(
-                "abc", "mistral", system_prompt_override="sys"
-            )
-
-
-def test_token_usage_logged_mistral(caplog):
-    """Verify token usage is logged for Mistral when token_logging is enabled."""
-    config = {
-        "mistral": {"model": "mistral-large-latest", "temperature": 0},
-        "token_logging": True,
-    }
-
-    gen = CommitMessageGenerator(token="fake", config=config, default_model="mistral")
-    module_path = CommitMessageGenerator.__module__
-
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "msg"}}],
-        "usage": {"prompt_tokens": 110, "completion_tokens": 45},
-    }
-
-    with caplog.at_level(logging.INFO):
-        with patch(f"{module_path}._http_post", mock_post):
-            gen.generate_openai_compatible(
-                "diff", "mistral", system_prompt_override="sys"
-            )
-
-    assert "Token usage [mistral]: prompt=110, completion=45, total=155" in caplog.text
-
-
 # ---------------------------
 # Tests for generate_deepseek
 # ---------------------------
 
 
-def test_generate_deepseek():
-    """DeepSeek is routed through the shared OpenAI-compatible call."""
-    config = {"deepseek": {"model": "deepseek-chat", "temperature": 0.5}}
-    gen = CommitMessageGenerator(
-        token="fake-token", config=config, default_model="deepseek"
-    )
-
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "  deepseek result  "}}]
-    }
-
-    with patch(f"{CommitMessageGenerator.__module__}._http_post", mock_post):
-        result = gen.generate_openai_compatible(
-            "diff content", "deepseek", system_prompt_override="sys"
-        )
-
-    assert result == "deepseek result"
-    assert mock_post.call_args[0][0] == "https://api.deepseek.com/v1/chat/completions"
-    assert mock_post.call_args[1]["json"]["model"] == "deepseek-chat"
-    assert mock_post.call_args[1]["json"]["temperature"] == 0.5
-
-
-def test_generate_deepseek_missing_temperature_does_not_raise():
+def test_generate_deepseek_missing_temperature_does_not_raise(gen_factory):
     """Regression: a deepseek config without a temperature key (optional per
     validation/doctor) must not KeyError, and the request must omit the key."""
     config = {"deepseek": {"model": "deepseek-chat"}}
-    gen = CommitMessageGenerator(
-        token="fake-token", config=config, default_model="deepseek"
-    )
+    gen = gen_factory("deepseek", config)
 
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "ok"}}]
-    }
+    mock_post = MagicMock(
+        return_value=_mock_response({"choices": [{"message": {"content": "ok"}}]})
+    )
 
     with patch(f"{CommitMessageGenerator.__module__}._http_post", mock_post):
         result = gen.generate_openai_compatible("diff content", "deepseek")
@@ -850,21 +809,18 @@ def test_generate_deepseek_missing_temperature_does_not_raise():
     assert "temperature" not in mock_post.call_args[1]["json"]
 
 
-def test_generate_deepseek_does_not_leak_openai_temperature():
+def test_generate_deepseek_does_not_leak_openai_temperature(gen_factory):
     """Regression: each provider reads only its own config block, so a
     deepseek call with no temperature must not inherit openai's."""
     config = {
         "deepseek": {"model": "deepseek-chat"},
         "openai": {"model": "gpt-5.4-mini", "temperature": 0.5},
     }
-    gen = CommitMessageGenerator(
-        token="fake-token", config=config, default_model="deepseek"
-    )
+    gen = gen_factory("deepseek", config)
 
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "ok"}}]
-    }
+    mock_post = MagicMock(
+        return_value=_mock_response({"choices": [{"message": {"content": "ok"}}]})
+    )
 
     with patch(f"{CommitMessageGenerator.__module__}._http_post", mock_post):
         gen.generate_openai_compatible("diff content", "deepseek")
@@ -877,105 +833,56 @@ def test_generate_deepseek_does_not_leak_openai_temperature():
 # ------------------------------------------
 
 
-def test_generate_openai_none_system_prompt_omits_system_message():
-    """OpenAI should not include system message when system_prompt_override is None."""
+@pytest.mark.parametrize("provider", ["openai", "mistral", "xai"])
+def test_generate_openai_compatible_none_system_prompt_omits_system_message(
+    provider, gen_factory
+):
+    """No system message is sent when system_prompt_override is None."""
     config = {
-        "openai": {"model": "gpt-5.1", "temperature": 0},
+        provider: {"model": "some-model", "temperature": 0},
     }
 
-    gen = CommitMessageGenerator(token="fake", config=config, default_model="openai")
+    gen = gen_factory(provider, config)
 
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "msg"}}]
-    }
+    mock_post = MagicMock(
+        return_value=_mock_response({"choices": [{"message": {"content": "msg"}}]})
+    )
 
     with patch(f"{CommitMessageGenerator.__module__}._http_post", mock_post):
-        gen.generate_openai_compatible("diff", "openai", system_prompt_override=None)
+        gen.generate_openai_compatible("diff", provider, system_prompt_override=None)
 
     messages = mock_post.call_args[1]["json"]["messages"]
     assert len(messages) == 1
     assert messages[0]["role"] == "user"
 
 
-def test_generate_mistral_none_system_prompt_omits_system_message():
-    """Mistral should not include system message when system_prompt_override is None."""
-    config = {
-        "mistral": {"model": "mistral-large-latest", "temperature": 0},
-    }
-
-    gen = CommitMessageGenerator(token="fake", config=config, default_model="mistral")
-    module_path = CommitMessageGenerator.__module__
-
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "msg"}}],
-    }
-
-    with patch(f"{module_path}._http_post", mock_post):
-        gen.generate_openai_compatible("diff", "mistral", system_prompt_override=None)
-
-    call_kwargs = mock_post.call_args[1]
-    messages = call_kwargs["json"]["messages"]
-    assert len(messages) == 1
-    assert messages[0]["role"] == "user"
-
-
-def test_generate_xai_none_system_prompt_omits_system_message():
-    """xAI should not include system message when system_prompt_override is None."""
-    config = {
-        "xai": {"model": "grok-4.3", "temperature": 0},
-    }
-
-    gen = CommitMessageGenerator(token="fake", config=config, default_model="xai")
-    module_path = CommitMessageGenerator.__module__
-
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "msg"}}],
-    }
-
-    with patch(f"{module_path}._http_post", mock_post):
-        gen.generate_openai_compatible("diff", "xai", system_prompt_override=None)
-
-    call_kwargs = mock_post.call_args[1]
-    messages = call_kwargs["json"]["messages"]
-    assert len(messages) == 1
-    assert messages[0]["role"] == "user"
-
-
 # ------------------------------------------
-# Tests for raise_for_status in xAI
+# Tests for raise_for_status
 # ------------------------------------------
 
 
-def test_generate_xai_raises_on_http_error():
-    """Test that generate_xai raises on HTTP error via raise_for_status."""
-    import requests
-
+@pytest.mark.parametrize(
+    "provider, error", [("mistral", "401 Unauthorized"), ("xai", "403 Forbidden")]
+)
+def test_generate_openai_compatible_raises_on_http_error(provider, error, gen_factory):
+    """HTTP errors surface via raise_for_status as requests.HTTPError."""
     config = {
-        "xai": {
-            "model": "grok-4.3",
+        provider: {
+            "model": "some-model",
             "temperature": 0.7,
         }
     }
 
-    gen = CommitMessageGenerator(
-        token="fake-token",
-        config=config,
-        default_model="xai",
-    )
-
-    module_path = CommitMessageGenerator.__module__
+    gen = gen_factory(provider, config)
 
     mock_post = MagicMock()
-    mock_post.return_value.raise_for_status.side_effect = requests.HTTPError(
-        "403 Forbidden"
-    )
+    mock_post.return_value.raise_for_status.side_effect = requests.HTTPError(error)
 
-    with patch(f"{module_path}._http_post", mock_post):
+    with patch(f"{CommitMessageGenerator.__module__}._http_post", mock_post):
         with pytest.raises(requests.HTTPError):
-            gen.generate_openai_compatible("abc", "xai", system_prompt_override="sys")
+            gen.generate_openai_compatible(
+                "abc", provider, system_prompt_override="sys"
+            )
 
 
 # ---------------------------
@@ -1076,8 +983,8 @@ def test_timeout_defaults_30_for_remote_providers(generator):
     assert generator._timeout("groq") == 30
 
 
-def test_timeout_defaults_300_for_ollama():
-    gen = CommitMessageGenerator(token=None, config={}, default_model="ollama")
+def test_timeout_defaults_300_for_ollama(gen_factory):
+    gen = gen_factory("ollama", {}, token=None)
     assert gen._timeout("ollama") == 300
 
 
@@ -1100,7 +1007,7 @@ def test_timeout_ollama_subconfig_wins_over_global():
     assert gen._timeout("groq") == 15
 
 
-def test_generate_anthropic_uses_configured_max_tokens():
+def test_generate_anthropic_uses_configured_max_tokens(gen_factory):
     config = {
         "anthropic": {
             "model": "claude-opus-4-6",
@@ -1108,9 +1015,8 @@ def test_generate_anthropic_uses_configured_max_tokens():
             "max_tokens": 12345,
         }
     }
-    gen = CommitMessageGenerator(token="fake", config=config, default_model="anthropic")
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {"content": [{"text": "ok"}]}
+    gen = gen_factory("anthropic", config)
+    mock_post = MagicMock(return_value=_mock_response({"content": [{"text": "ok"}]}))
 
     with patch(f"{CommitMessageGenerator.__module__}._http_post", mock_post):
         gen.generate_anthropic("abc", system_prompt_override="sys")
@@ -1119,11 +1025,10 @@ def test_generate_anthropic_uses_configured_max_tokens():
     assert kwargs["json"]["max_tokens"] == 12345
 
 
-def test_generate_anthropic_defaults_max_tokens_to_32768():
+def test_generate_anthropic_defaults_max_tokens_to_32768(gen_factory):
     config = {"anthropic": {"model": "m", "temperature": 0}}
-    gen = CommitMessageGenerator(token="t", config=config, default_model="anthropic")
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {"content": [{"text": "ok"}]}
+    gen = gen_factory("anthropic", config)
+    mock_post = MagicMock(return_value=_mock_response({"content": [{"text": "ok"}]}))
 
     with patch(f"{CommitMessageGenerator.__module__}._http_post", mock_post):
         gen.generate_anthropic("abc", system_prompt_override="sys")
@@ -1168,61 +1073,56 @@ def test_generate_anthropic_defaults_max_tokens_to_32768():
     ],
 )
 def test_remote_providers_respect_configured_timeout(
-    provider, model_key, response_json, url
+    provider, model_key, response_json, url, gen_factory
 ):
     config = {provider: model_key, "timeout": 77}
-    gen = CommitMessageGenerator(token="t", config=config, default_model=provider)
+    gen = gen_factory(provider, config)
 
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = response_json
+    mock_post = MagicMock(return_value=_mock_response(response_json))
 
     with patch(f"{CommitMessageGenerator.__module__}._http_post", mock_post):
         gen._dispatch_generate("abc", "sys")
 
     _, kwargs = mock_post.call_args
-    assert kwargs["timeout"] == 77
+    assert kwargs["timeout"] == (3.05, 77)
     if url is not None:
         assert mock_post.call_args[0][0] == url
 
 
-def test_generate_ollama_uses_ollama_timeout():
+def test_generate_ollama_uses_ollama_timeout(gen_factory):
     config = {
         "ollama": {"model": "llama3.1", "temperature": 0, "timeout": 42},
     }
-    gen = CommitMessageGenerator(token=None, config=config, default_model="ollama")
+    gen = gen_factory("ollama", config, token=None)
 
     module_path = CommitMessageGenerator.__module__
-    mock_post = MagicMock()
-    mock_post.return_value.status_code = 200
-    mock_post.return_value.raise_for_status.return_value = None
-    mock_post.return_value.json.return_value = {"message": {"content": "x"}}
+    mock_post = MagicMock(return_value=_mock_response({"message": {"content": "x"}}))
 
     with (
         patch.dict(f"{module_path}.os.environ", {}, clear=True),
         patch(f"{module_path}.shutil.which", return_value="/usr/bin/ollama"),
-        patch(f"{module_path}.requests.get", return_value=MagicMock(status_code=200)),
+        patch(f"{module_path}.socket.create_connection"),
         patch(f"{module_path}._http_post", mock_post),
     ):
         gen.generate_ollama("abc", system_prompt_override="sys")
 
     _, kwargs = mock_post.call_args
-    assert kwargs["timeout"] == 42
+    assert kwargs["timeout"] == (3.05, 42)
 
 
-def test_generate_openai_receives_timeout():
+def test_generate_openai_receives_timeout(gen_factory):
     config = {"openai": {"model": "gpt-5.1", "temperature": 0}, "timeout": 55}
-    gen = CommitMessageGenerator(token="t", config=config, default_model="openai")
+    gen = gen_factory("openai", config)
 
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "ok"}}]
-    }
+    mock_post = MagicMock(
+        return_value=_mock_response({"choices": [{"message": {"content": "ok"}}]})
+    )
 
     with patch(f"{CommitMessageGenerator.__module__}._http_post", mock_post):
         gen.generate_openai_compatible("abc", "openai", system_prompt_override="sys")
 
     _, kwargs = mock_post.call_args
-    assert kwargs["timeout"] == 55
+    assert kwargs["timeout"] == (3.05, 55)
 
 
 # ---------------------------------------------------------------------------
@@ -1272,6 +1172,18 @@ def test_retry_session_uses_backoff_and_finite_attempts():
     assert retry.raise_on_status is False
 
 
+def test_retry_session_sizes_keep_alive_pool():
+    """Concurrent provider calls must fit the per-host pool so sockets are
+    reused rather than opened and discarded."""
+    from git_cai_cli.core.llm import _build_retrying_session
+
+    session = _build_retrying_session()
+    adapter = session.get_adapter("https://example.com/")
+
+    assert adapter._pool_connections == 4
+    assert adapter._pool_maxsize == 16
+
+
 def test_http_post_routes_through_retrying_session(monkeypatch):
     """The provider-facing helper _http_post must use the retrying
     session, not raw requests.post."""
@@ -1312,7 +1224,7 @@ def test_http_post_routes_through_retrying_session(monkeypatch):
 # ---------------------------------------------------------------------------
 
 
-def test_anthropic_max_output_tokens_overrides_max_tokens():
+def test_anthropic_max_output_tokens_overrides_max_tokens(gen_factory):
     """max_output_tokens (canonical) wins over the legacy max_tokens key."""
     config = {
         "anthropic": {
@@ -1322,10 +1234,9 @@ def test_anthropic_max_output_tokens_overrides_max_tokens():
             "max_output_tokens": 5000,
         }
     }
-    gen = CommitMessageGenerator(token="t", config=config, default_model="anthropic")
+    gen = gen_factory("anthropic", config)
 
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {"content": [{"text": "ok"}]}
+    mock_post = MagicMock(return_value=_mock_response({"content": [{"text": "ok"}]}))
 
     with patch(f"{CommitMessageGenerator.__module__}._http_post", mock_post):
         gen.generate_anthropic("abc", system_prompt_override="sys")
@@ -1334,13 +1245,12 @@ def test_anthropic_max_output_tokens_overrides_max_tokens():
     assert kwargs["json"]["max_tokens"] == 5000
 
 
-def test_anthropic_legacy_max_tokens_still_works():
+def test_anthropic_legacy_max_tokens_still_works(gen_factory):
     """Existing user configs that only use max_tokens must keep working."""
     config = {"anthropic": {"model": "m", "temperature": 0, "max_tokens": 7777}}
-    gen = CommitMessageGenerator(token="t", config=config, default_model="anthropic")
+    gen = gen_factory("anthropic", config)
 
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {"content": [{"text": "ok"}]}
+    mock_post = MagicMock(return_value=_mock_response({"content": [{"text": "ok"}]}))
 
     with patch(f"{CommitMessageGenerator.__module__}._http_post", mock_post):
         gen.generate_anthropic("abc", system_prompt_override="sys")
@@ -1354,15 +1264,15 @@ def test_anthropic_legacy_max_tokens_still_works():
 # ---------------------------------------------------------------------------
 
 
-def test_ollama_startup_timeout_uses_config_value():
+def test_ollama_startup_timeout_uses_config_value(gen_factory):
     config = {"ollama": {"model": "llama3", "temperature": 0, "startup_timeout": 30}}
-    gen = CommitMessageGenerator(token=None, config=config, default_model="ollama")
+    gen = gen_factory("ollama", config, token=None)
     assert gen._ollama_startup_timeout() == 30.0
 
 
-def test_ollama_startup_timeout_default():
+def test_ollama_startup_timeout_default(gen_factory):
     config = {"ollama": {"model": "llama3", "temperature": 0}}
-    gen = CommitMessageGenerator(token=None, config=config, default_model="ollama")
+    gen = gen_factory("ollama", config, token=None)
     assert gen._ollama_startup_timeout() == 8.0
 
 
@@ -1428,25 +1338,24 @@ def test_resolve_temperature_rejected_warns_and_drops(caplog):
 # ---------------------------------------------------------------------------
 
 
-def test_groq_includes_temperature_for_accepting_model():
+def test_groq_includes_temperature_for_accepting_model(gen_factory):
     """Groq model that accepts temperature keeps it in the request body."""
     config = {
         "groq": {"model": "openai/gpt-oss-20b", "temperature": 0},
     }
 
-    gen = CommitMessageGenerator(
-        token="fake-token",
-        config=config,
-        default_model="groq",
-    )
+    gen = gen_factory("groq", config)
 
     module_path = CommitMessageGenerator.__module__
 
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "msg"}}],
-        "usage": {},
-    }
+    mock_post = MagicMock(
+        return_value=_mock_response(
+            {
+                "choices": [{"message": {"content": "msg"}}],
+                "usage": {},
+            }
+        )
+    )
 
     with patch(f"{module_path}._http_post", mock_post):
         gen.generate_openai_compatible("diff", "groq")
@@ -1455,23 +1364,18 @@ def test_groq_includes_temperature_for_accepting_model():
     assert kwargs["json"]["temperature"] == 0
 
 
-def test_openai_omits_temperature_for_gpt5(caplog):
+def test_openai_omits_temperature_for_gpt5(caplog, gen_factory):
     """gpt-5.4-mini rejects temperature -> create() is called without it,
     and a warning is logged because a temperature was configured."""
     config = {
         "openai": {"model": "gpt-5.4-mini", "temperature": 0},
     }
 
-    gen = CommitMessageGenerator(
-        token="fake-token",
-        config=config,
-        default_model="openai",
-    )
+    gen = gen_factory("openai", config)
 
-    mock_post = MagicMock()
-    mock_post.return_value.json.return_value = {
-        "choices": [{"message": {"content": "msg"}}]
-    }
+    mock_post = MagicMock(
+        return_value=_mock_response({"choices": [{"message": {"content": "msg"}}]})
+    )
 
     with caplog.at_level(logging.WARNING):
         with patch(f"{CommitMessageGenerator.__module__}._http_post", mock_post):
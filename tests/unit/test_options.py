@@ -44,6 +44,25 @@ def test_check_and_update_request_failure(caplog) -> None:
     assert "Could not fetch version info" in caplog.text
 
 
+def test_check_and_update_malformed_response(caplog) -> None:
+    """
+    A PyPI reply without ``info.version`` is reported, not raised.
+    """
+    manager = CliManager()
+
+    response = MagicMock()
+    response.json.return_value = {"message": "Not Found"}
+
+    with (
+        patch("git_cai_cli.core.options.version", return_value="0.1.0"),
+        patch("git_cai_cli.core.options.requests.get", return_value=response),
+        caplog.at_level(logging.ERROR),
+    ):
+        manager.check_and_update()
+
+    assert "Unexpected version info" in caplog.text
+
+
 def test_check_and_update_already_up_to_date(capsys) -> None:
     """
     Test behavior when the package is already up to date.
@@ -76,6 +95,8 @@ def test_check_and_update_user_declines(capsys) -> None:
         patch("git_cai_cli.core.options.version", return_value="1.0.0"),
         patch("git_cai_cli.core.options.requests.get", return_value=response),
         patch("builtins.input", return_value="no"),
+        patch("git_cai_cli.core.options.sys.stdin.isatty", return_value=True),
+        patch.dict("os.environ", {"CI": ""}),
     ):
         manager.check_and_update()
 
@@ -83,6 +104,80 @@ def test_check_and_update_user_declines(capsys) -> None:
     assert "Update cancelled" in out
 
 
+def test_check_and_update_skips_prompt_in_ci(capsys, monkeypatch) -> None:
+    """
+    In CI the update is reported but neither prompted for nor applied.
+    """
+    monkeypatch.setenv("CI", "1")
+    manager = CliManager()
+
+    response = MagicMock()
+    response.json.return_value = {"info": {"version": "2.0.0"}}
+
+    with (
+        patch("git_cai_cli.core.options.version", return_value="1.0.0"),
+        patch("git_cai_cli.core.options.requests.get", return_value=response),
+        patch("builtins.input") as mock_input,
+        patch("subprocess.run") as mock_run,
+        patch("git_cai_cli.core.options.sys.stdin.isatty", return_value=True),
+    ):
+        manager.check_and_update()
+
+    mock_input.assert_not_called()
+    mock_run.assert_not_called()
+    out = capsys.readouterr().out
+    assert "Update available" in out
+    assert "pipx upgrade git-cai-cli" in out
+
+
+def test_check_and_update_skips_prompt_without_tty(capsys, monkeypatch) -> None:
+    """
+    Outside CI, a non-interactive stdin (hook, pipe) also skips the prompt.
+    """
+    monkeypatch.delenv("CI", raising=False)
+    manager = CliManager()
+
+    response = MagicMock()
+    response.json.return_value = {"info": {"version": "2.0.0"}}
+
+    with (
+        patch("git_cai_cli.core.options.version", return_value="1.0.0"),
+        patch("git_cai_cli.core.options.requests.get", return_value=response),
+        patch("builtins.input") as mock_input,
+        patch("subprocess.run") as mock_run,
+        patch("git_cai_cli.core.options.sys.stdin.isatty", return_value=False),
+    ):
+        manager.check_and_update()
+
+    mock_input.assert_not_called()
+    mock_run.assert_not_called()
+    out = capsys.readouterr().out
+    assert "Update available" in out
+    assert "pipx upgrade git-cai-cli" in out
+
+
+@pytest.mark.parametrize("ci_value", ["false", "0", "FALSE"])
+def test_check_and_update_prompts_when_ci_is_falsey(ci_value, monkeypatch) -> None:
+    """
+    CI=false / CI=0 is not a CI run; the interactive prompt is still shown.
+    """
+    monkeypatch.setenv("CI", ci_value)
+    manager = CliManager()
+
+    response = MagicMock()
+    response.json.return_value = {"info": {"version": "2.0.0"}}
+
+    with (
+        patch("git_cai_cli.core.options.version", return_value="1.0.0"),
+        patch("git_cai_cli.core.options.requests.get", return_value=response),
+        patch("builtins.input", return_value="no") as mock_input,
+        patch("git_cai_cli.core.options.sys.stdin.isatty", return_value=True),
+    ):
+        manager.check_and_update()
+
+    mock_input.assert_called_once()
+
+
 def test_check_and_update_auto_confirm_success(capsys) -> None:
     """
     Test successful update with auto_confirm=True.
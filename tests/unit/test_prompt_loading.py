@@ -2,33 +2,46 @@
 Unit tests for prompt loading, custom prompt files, and 'none' config values.
 """
 
+from contextlib import contextmanager
 from pathlib import Path
+from types import MappingProxyType
 from unittest.mock import patch
 
 import pytest
+from git_cai_cli.core.config import DEFAULT_CONFIG
 from git_cai_cli.core.llm import (
     CommitMessageGenerator,
     load_prompt_file,
 )
 from git_cai_cli.core.prompts_fallback import (
+    HARDCODED_CHANGELOG_PROMPT,
     HARDCODED_COMMIT_PROMPT,
+    HARDCODED_EXPLAIN_PROMPT,
     HARDCODED_FULL_FILES_PROMPT,
     HARDCODED_PR_PROMPT,
+    HARDCODED_RELEASE_PROMPT,
+    HARDCODED_SPLIT_PROMPT,
     HARDCODED_SQUASH_PROMPT,
 )
+from git_cai_cli.core.validate import (
+    ALLOWED_GLOBAL_KEYS,
+    _validate_config_keys,
+    _validate_language,
+    _validate_style,
+)
+
+# Under ``pytest -n auto --dist=loadgroup`` keep this module on one worker so
+# the session fixtures below and llm's prompt cache are built only once.
+pytestmark = pytest.mark.xdist_group("prompt_loading")
 
 # ---------------------------------------------------------------------------
 # Fixtures
 # ---------------------------------------------------------------------------
 
 
-@pytest.fixture
-def base_config():
-    """
-    Provides a default configuration dictionary for testing.
-    """
-    return {
-        "openai": {"model": "gpt-5.1", "temperature": 0},
+_BASE_CONFIG = MappingProxyType(
+    {
+        "openai": MappingProxyType({"model": "gpt-5.1", "temperature": 0}),
         "language": "en",
         "default": "openai",
         "style": "professional",
@@ -36,6 +49,81 @@ def base_config():
         "prompt_file": "",
         "squash_prompt_file": "",
     }
+)
+
+
+def _copy_base_config():
+    """Mutable copy of ``_BASE_CONFIG``, including its nested provider block."""
+    return {**_BASE_CONFIG, "openai": dict(_BASE_CONFIG["openai"])}
+
+
+@pytest.fixture
+def base_config():
+    """
+    Provides a default configuration dictionary for testing.
+    """
+    return _copy_base_config()
+
+
+_PROMPT_FILES = {
+    "custom.md": "Custom user prompt content",
+    "stripped.md": "\n  Custom prompt  \n\n",
+    "plain.md": "Custom prompt",
+    "custom_only.md": "My custom prompt only",
+    "custom_squash.md": "My custom squash prompt",
+    "generate.md": "Generate a commit message.",
+    "just_do_this.md": "Just do this.",
+    "full_files.md": "Custom full-files prompt.",
+    "summarize.md": "Summarize commits.",
+    "squash_only.md": "Custom squash only.",
+    "base.md": "Base prompt body.\n",
+    "squash_base.md": "Squash base body.\n",
+    "pr_base.md": "PR base body.\n",
+}
+
+
+@pytest.fixture(scope="session")
+def prompt_files(tmp_path_factory):
+    """
+    Directory of read-only prompt files, written once per session.
+    Tests that modify a prompt file must create their own under ``tmp_path``.
+    """
+    root = tmp_path_factory.mktemp("prompts")
+    for name, text in _PROMPT_FILES.items():
+        (root / name).write_text(text, encoding="utf-8")
+    return root
+
+
+@pytest.fixture(scope="session")
+def lowered_prompts():
+    """
+    Lower-cased hardcoded prompts, computed once for case-insensitive checks.
+    """
+    return {
+        "commit": HARDCODED_COMMIT_PROMPT.lower(),
+        "full_files": HARDCODED_FULL_FILES_PROMPT.lower(),
+        "squash": HARDCODED_SQUASH_PROMPT.lower(),
+    }
+
+
+@pytest.fixture(scope="module")
+def shared_generator():
+    """
+    One generator for tests that only exercise the instruction helpers;
+    adjust its settings with ``override_config``.
+    """
+    return CommitMessageGenerator("tok", _copy_base_config(), "openai")
+
+
+@contextmanager
+def override_config(gen, **values):
+    """Temporarily set top-level config keys on ``gen``, restoring them on exit."""
+    saved = {key: gen.config[key] for key in values}
+    gen.config.update(values)
+    try:
+        yield gen
+    finally:
+        gen.config.update(saved)
 
 
 @pytest.fixture
@@ -58,10 +146,9 @@ def generator(base_config):
 class TestLoadPromptFileUserDefined:
     """Tests for loading prompts from user-defined file paths."""
 
-    def test_loads_from_user_file(self, tmp_path):
+    def test_loads_from_user_file(self, prompt_files):
         """User-defined file path is used when it exists."""
-        prompt_file = tmp_path / "my_prompt.md"
-        prompt_file.write_text("Custom user prompt content", encoding="utf-8")
+        prompt_file = prompt_files / "custom.md"
 
         config = {"prompt_file": str(prompt_file)}
 
@@ -89,10 +176,9 @@ class TestLoadPromptFileUserDefined:
         assert len(result) > 0
         assert "expert software engineer" in result.lower()
 
-    def test_user_file_strips_whitespace(self, tmp_path):
+    def test_user_file_strips_whitespace(self, prompt_files):
         """User-defined file content is stripped of leading/trailing whitespace."""
-        prompt_file = tmp_path / "prompt.md"
-        prompt_file.write_text("\n  Custom prompt  \n\n", encoding="utf-8")
+        prompt_file = prompt_files / "stripped.md"
 
         config = {"prompt_file": str(prompt_file)}
 
@@ -105,6 +191,26 @@ class TestLoadPromptFileUserDefined:
 
         assert result == "Custom prompt"
 
+    def test_user_file_is_reread_after_edit(self, tmp_path):
+        """Repeat loads are memoized, but an edited file is picked up."""
+        prompt_file = tmp_path / "prompt.md"
+        prompt_file.write_text("First", encoding="utf-8")
+        config = {"prompt_file": str(prompt_file)}
+        kwargs = {
+            "config_key": "prompt_file",
+            "config": config,
+            "default_filename": "commit_prompt.md",
+            "hardcoded_fallback": HARDCODED_COMMIT_PROMPT,
+        }
+
+        assert load_prompt_file(**kwargs) == "First"
+        with patch.object(Path, "read_text") as read_text:
+            assert load_prompt_file(**kwargs) == "First"
+        read_text.assert_not_called()
+
+        prompt_file.write_text("Second, longer", encoding="utf-8")
+        assert load_prompt_file(**kwargs) == "Second, longer"
+
     def test_empty_config_key_falls_back(self):
         """Empty string for config key falls back to default."""
         config = {"prompt_file": ""}
@@ -140,37 +246,37 @@ class TestLoadPromptFileUserDefined:
 class TestLoadPromptFileDefault:
     """Tests for loading prompts from the ~/.config/cai/ fallback location."""
 
-    def test_loads_default_commit_prompt_from_config_dir(self, tmp_path):
+    def test_loads_default_commit_prompt_from_config_dir(self, tmp_path, monkeypatch):
         """commit_prompt.md under CONFIG_DIR is used when no user file is set."""
         config = {"prompt_file": ""}
         (tmp_path / "commit_prompt.md").write_text(
             "Global commit prompt body.", encoding="utf-8"
         )
 
-        with patch("git_cai_cli.core.llm.CONFIG_DIR", tmp_path):
-            result = load_prompt_file(
-                config_key="prompt_file",
-                config=config,
-                default_filename="commit_prompt.md",
-                hardcoded_fallback=HARDCODED_COMMIT_PROMPT,
-            )
+        monkeypatch.setattr("git_cai_cli.core.llm.CONFIG_DIR", tmp_path)
+        result = load_prompt_file(
+            config_key="prompt_file",
+            config=config,
+            default_filename="commit_prompt.md",
+            hardcoded_fallback=HARDCODED_COMMIT_PROMPT,
+        )
 
         assert result == "Global commit prompt body."
 
-    def test_loads_default_squash_prompt_from_config_dir(self, tmp_path):
+    def test_loads_default_squash_prompt_from_config_dir(self, tmp_path, monkeypatch):
         """squash_prompt.md under CONFIG_DIR is used when no user file is set."""
         config = {"squash_prompt_file": ""}
         (tmp_path / "squash_prompt.md").write_text(
             "Global squash prompt body.", encoding="utf-8"
         )
 
-        with patch("git_cai_cli.core.llm.CONFIG_DIR", tmp_path):
-            result = load_prompt_file(
-                config_key="squash_prompt_file",
-                config=config,
-                default_filename="squash_prompt.md",
-                hardcoded_fallback=HARDCODED_SQUASH_PROMPT,
-            )
+        monkeypatch.setattr("git_cai_cli.core.llm.CONFIG_DIR", tmp_path)
+        result = load_prompt_file(
+            config_key="squash_prompt_file",
+            config=config,
+            default_filename="squash_prompt.md",
+            hardcoded_fallback=HARDCODED_SQUASH_PROMPT,
+        )
 
         assert result == "Global squash prompt body."
 
@@ -183,7 +289,7 @@ class TestLoadPromptFileDefault:
 class TestLoadPromptFileHardcoded:
     """Tests for the hardcoded fallback when no files are available."""
 
-    def test_hardcoded_fallback_when_default_missing(self, tmp_path):
+    def test_hardcoded_fallback_when_default_missing(self, tmp_path, monkeypatch):
         """
         Hardcoded fallback is used when both user file and ~/.config/cai/ file are missing.
         """
@@ -191,17 +297,19 @@ class TestLoadPromptFileHardcoded:
         empty_dir = tmp_path / "no_config"
         empty_dir.mkdir()
 
-        with patch("git_cai_cli.core.llm.CONFIG_DIR", empty_dir):
-            result = load_prompt_file(
-                config_key="prompt_file",
-                config=config,
-                default_filename="commit_prompt.md",
-                hardcoded_fallback=HARDCODED_COMMIT_PROMPT,
-            )
+        monkeypatch.setattr("git_cai_cli.core.llm.CONFIG_DIR", empty_dir)
+        result = load_prompt_file(
+            config_key="prompt_file",
+            config=config,
+            default_filename="commit_prompt.md",
+            hardcoded_fallback=HARDCODED_COMMIT_PROMPT,
+        )
 
         assert result == HARDCODED_COMMIT_PROMPT
 
-    def test_hardcoded_squash_fallback_when_default_missing(self, tmp_path):
+    def test_hardcoded_squash_fallback_when_default_missing(
+        self, tmp_path, monkeypatch
+    ):
         """
         Hardcoded squash fallback is used when both user file and ~/.config/cai/ file are missing.
         """
@@ -209,13 +317,13 @@ class TestLoadPromptFileHardcoded:
         empty_dir = tmp_path / "no_config"
         empty_dir.mkdir()
 
-        with patch("git_cai_cli.core.llm.CONFIG_DIR", empty_dir):
-            result = load_prompt_file(
-                config_key="squash_prompt_file",
-                config=config,
-                default_filename="squash_prompt.md",
-                hardcoded_fallback=HARDCODED_SQUASH_PROMPT,
-            )
+        monkeypatch.setattr("git_cai_cli.core.llm.CONFIG_DIR", empty_dir)
+        result = load_prompt_file(
+            config_key="squash_prompt_file",
+            config=config,
+            default_filename="squash_prompt.md",
+            hardcoded_fallback=HARDCODED_SQUASH_PROMPT,
+        )
 
         assert result == HARDCODED_SQUASH_PROMPT
 
@@ -227,7 +335,9 @@ class TestLoadPromptFileHardcoded:
         assert "professional" not in HARDCODED_COMMIT_PROMPT
         assert "professional" not in HARDCODED_FULL_FILES_PROMPT
 
-    def test_style_override_is_authoritative_in_fallback(self, base_config):
+    def test_style_override_is_authoritative_in_fallback(
+        self, base_config, monkeypatch
+    ):
         """
         With the hardcoded fallback (no config files) and style overridden to
         'funny', the built prompt carries only the chosen style — not the old
@@ -237,8 +347,8 @@ class TestLoadPromptFileHardcoded:
         gen = CommitMessageGenerator("tok", base_config, "openai")
 
         empty_dir = Path("/nonexistent-cai-config-dir")
-        with patch("git_cai_cli.core.llm.CONFIG_DIR", empty_dir):
-            prompt = gen._build_commit_prompt()
+        monkeypatch.setattr("git_cai_cli.core.llm.CONFIG_DIR", empty_dir)
+        prompt = gen._build_commit_prompt()
 
         assert "funny" in prompt
         assert "professional" not in prompt
@@ -249,14 +359,18 @@ class TestLoadPromptFileHardcoded:
 # ---------------------------------------------------------------------------
 
 
+def _messages(caplog):
+    """Lower-cased message of every captured record."""
+    return [record.getMessage().lower() for record in caplog.records]
+
+
 class TestLoadPromptFileLogging:
     """Tests that load_prompt_file emits appropriate log messages."""
 
-    def test_logs_user_file_loaded(self, tmp_path, caplog):
+    def test_logs_user_file_loaded(self, prompt_files, caplog):
         """Logs info when loading from user-defined file."""
         caplog.set_level("INFO")
-        prompt_file = tmp_path / "my_prompt.md"
-        prompt_file.write_text("Custom prompt", encoding="utf-8")
+        prompt_file = prompt_files / "plain.md"
 
         config = {"prompt_file": str(prompt_file)}
 
@@ -267,7 +381,7 @@ class TestLoadPromptFileLogging:
             hardcoded_fallback=HARDCODED_COMMIT_PROMPT,
         )
 
-        assert "user-defined file" in caplog.text.lower()
+        assert any("user-defined file" in m for m in _messages(caplog))
 
     def test_logs_warning_when_user_file_missing(self, tmp_path, caplog):
         """Logs warning when user file path doesn't exist."""
@@ -282,47 +396,47 @@ class TestLoadPromptFileLogging:
             hardcoded_fallback=HARDCODED_COMMIT_PROMPT,
         )
 
-        assert "not found" in caplog.text.lower()
+        assert any("not found" in m for m in _messages(caplog))
 
-    def test_logs_default_file_loaded(self, tmp_path, caplog):
+    def test_logs_default_file_loaded(self, tmp_path, caplog, monkeypatch):
         """Logs info about missing local file and shows full default path."""
         caplog.set_level("INFO")
         config = {"prompt_file": ""}
         (tmp_path / "commit_prompt.md").write_text("body", encoding="utf-8")
 
-        with patch("git_cai_cli.core.llm.CONFIG_DIR", tmp_path):
-            load_prompt_file(
-                config_key="prompt_file",
-                config=config,
-                default_filename="commit_prompt.md",
-                hardcoded_fallback=HARDCODED_COMMIT_PROMPT,
-            )
+        monkeypatch.setattr("git_cai_cli.core.llm.CONFIG_DIR", tmp_path)
+        load_prompt_file(
+            config_key="prompt_file",
+            config=config,
+            default_filename="commit_prompt.md",
+            hardcoded_fallback=HARDCODED_COMMIT_PROMPT,
+        )
 
-        assert "no local prompt file" in caplog.text.lower()
-        assert "default file" in caplog.text.lower()
+        msgs = _messages(caplog)
+        assert any("no local prompt file" in m for m in msgs)
+        assert any("default file" in m for m in msgs)
         # Full path must be logged, not just the filename
-        assert "commit_prompt.md" in caplog.text
+        full_path = str(tmp_path / "commit_prompt.md").lower()
+        assert any(full_path in m for m in msgs)
 
-    def test_logs_hardcoded_fallback(self, tmp_path, caplog):
+    def test_logs_hardcoded_fallback(self, tmp_path, monkeypatch, caplog):
         """Logs warning when using hardcoded fallback."""
         caplog.set_level("WARNING")
         config = {"prompt_file": ""}
         empty_dir = tmp_path / "no_config"
         empty_dir.mkdir()
 
-        with patch("git_cai_cli.core.llm.CONFIG_DIR", empty_dir):
-            load_prompt_file(
-                config_key="prompt_file",
-                config=config,
-                default_filename="commit_prompt.md",
-                hardcoded_fallback=HARDCODED_COMMIT_PROMPT,
-            )
+        monkeypatch.setattr("git_cai_cli.core.llm.CONFIG_DIR", empty_dir)
+        load_prompt_file(
+            config_key="prompt_file",
+            config=config,
+            default_filename="commit_prompt.md",
+            hardcoded_fallback=HARDCODED_COMMIT_PROMPT,
+        )
 
-        assert "hardcoded fallback" in caplog.text.lower()
         assert any(
-            r.levelname == "WARNING"
+            r.levelname == "WARNING" and "hardcoded fallback" in r.getMessage().lower()
             for r in caplog.records
-            if "hardcoded" in r.message.lower()
         )
 
 
@@ -334,29 +448,21 @@ class TestLoadPromptFileLogging:
 class TestLanguageNone:
     """Tests for language='none' in prompts."""
 
-    def test_language_none_omits_language_instruction(self, base_config):
+    def test_language_none_omits_language_instruction(self, shared_generator):
         """When language is 'none', no language instruction is in the prompt."""
-        base_config["language"] = "none"
-        gen = CommitMessageGenerator("tok", base_config, "openai")
-
-        instruction = gen._language_instruction()
-        assert instruction == ""
+        with override_config(shared_generator, language="none") as gen:
+            assert gen._language_instruction() == ""
 
-    def test_language_none_not_in_commit_prompt(self, base_config):
+    def test_language_none_not_in_commit_prompt(self, shared_generator):
         """Commit prompt does not contain language text when set to 'none'."""
-        base_config["language"] = "none"
-        gen = CommitMessageGenerator("tok", base_config, "openai")
-
-        prompt = gen._build_commit_prompt()
+        with override_config(shared_generator, language="none") as gen:
+            prompt = gen._build_commit_prompt()
         assert "Write the commit message in " not in prompt or "tone style" in prompt
 
-    def test_language_normal_includes_instruction(self, base_config):
+    def test_language_normal_includes_instruction(self, shared_generator):
         """When language is 'en', the instruction is included."""
-        base_config["language"] = "en"
-        gen = CommitMessageGenerator("tok", base_config, "openai")
-
-        instruction = gen._language_instruction()
-        assert "English" in instruction
+        with override_config(shared_generator, language="en") as gen:
+            assert "English" in gen._language_instruction()
 
 
 # ---------------------------------------------------------------------------
@@ -367,29 +473,21 @@ class TestLanguageNone:
 class TestStyleNone:
     """Tests for style='none' in prompts."""
 
-    def test_style_none_omits_style_instruction(self, base_config):
+    def test_style_none_omits_style_instruction(self, shared_generator):
         """When style is 'none', no style instruction is in the prompt."""
-        base_config["style"] = "none"
-        gen = CommitMessageGenerator("tok", base_config, "openai")
-
-        instruction = gen._style_instruction()
-        assert instruction == ""
+        with override_config(shared_generator, style="none") as gen:
+            assert gen._style_instruction() == ""
 
-    def test_style_none_not_in_commit_prompt(self, base_config):
+    def test_style_none_not_in_commit_prompt(self, shared_generator):
         """Commit prompt does not contain style instruction when set to 'none'."""
-        base_config["style"] = "none"
-        gen = CommitMessageGenerator("tok", base_config, "openai")
-
-        prompt = gen._build_commit_prompt()
+        with override_config(shared_generator, style="none") as gen:
+            prompt = gen._build_commit_prompt()
         assert "tone style" not in prompt
 
-    def test_style_normal_includes_instruction(self, base_config):
+    def test_style_normal_includes_instruction(self, shared_generator):
         """When style is 'professional', the instruction is included."""
-        base_config["style"] = "professional"
-        gen = CommitMessageGenerator("tok", base_config, "openai")
-
-        instruction = gen._style_instruction()
-        assert "professional" in instruction
+        with override_config(shared_generator, style="professional") as gen:
+            assert "professional" in gen._style_instruction()
 
 
 # ---------------------------------------------------------------------------
@@ -400,38 +498,23 @@ class TestStyleNone:
 class TestEmojiNone:
     """Tests for emoji='none' in prompts."""
 
-    def test_emoji_none_omits_emoji_instruction(self, base_config):
-        """When emoji is 'none', no emoji instruction is in the prompt."""
-        base_config["emoji"] = "none"
-        gen = CommitMessageGenerator("tok", base_config, "openai")
-
-        instruction = gen._emoji_instruction()
-        assert instruction == ""
-
-    def test_emoji_none_string_case_insensitive(self, base_config):
-        """'None' (capitalized) also works."""
-        base_config["emoji"] = "None"
-        gen = CommitMessageGenerator("tok", base_config, "openai")
-
-        instruction = gen._emoji_instruction()
-        assert instruction == ""
-
-    def test_emoji_true_includes_instruction(self, base_config):
-        """When emoji is True, instruction to use emojis is included."""
-        base_config["emoji"] = True
-        gen = CommitMessageGenerator("tok", base_config, "openai")
-
-        instruction = gen._emoji_instruction()
-        assert "emojis" in instruction.lower()
-        assert "Use relevant" in instruction
-
-    def test_emoji_false_includes_no_emoji_instruction(self, base_config):
-        """When emoji is False, instruction to not use emojis is included."""
-        base_config["emoji"] = False
-        gen = CommitMessageGenerator("tok", base_config, "openai")
+    @pytest.mark.parametrize(
+        "emoji, expected",
+        [
+            ("none", ""),
+            ("None", ""),
+            (True, CommitMessageGenerator._EMOJI_ON),
+            (False, CommitMessageGenerator._EMOJI_OFF),
+        ],
+    )
+    def test_emoji_instruction(self, shared_generator, emoji, expected):
+        """'none' in any case omits the instruction; booleans pick on/off."""
+        with override_config(shared_generator, emoji=emoji) as gen:
+            assert gen._emoji_instruction() == expected
 
-        instruction = gen._emoji_instruction()
-        assert "Do not use any emojis" in instruction
+    def test_emoji_instruction_wording(self):
+        assert "Use relevant" in CommitMessageGenerator._EMOJI_ON
+        assert "Do not use any emojis" in CommitMessageGenerator._EMOJI_OFF
 
 
 # ---------------------------------------------------------------------------
@@ -442,14 +525,13 @@ class TestEmojiNone:
 class TestAllNone:
     """Tests when all config settings are 'none'."""
 
-    def test_all_none_only_base_prompt(self, tmp_path, base_config):
+    def test_all_none_only_base_prompt(self, prompt_files, base_config):
         """When language, style, emoji are all 'none', prompt is just the base."""
         base_config["language"] = "none"
         base_config["style"] = "none"
         base_config["emoji"] = "none"
 
-        prompt_file = tmp_path / "custom.md"
-        prompt_file.write_text("My custom prompt only", encoding="utf-8")
+        prompt_file = prompt_files / "custom_only.md"
         base_config["prompt_file"] = str(prompt_file)
 
         gen = CommitMessageGenerator("tok", base_config, "openai")
@@ -457,14 +539,13 @@ class TestAllNone:
 
         assert prompt == "My custom prompt only"
 
-    def test_all_none_squash_only_base_prompt(self, tmp_path, base_config):
+    def test_all_none_squash_only_base_prompt(self, prompt_files, base_config):
         """When language, style, emoji are all 'none', squash prompt is just the base."""
         base_config["language"] = "none"
         base_config["style"] = "none"
         base_config["emoji"] = "none"
 
-        prompt_file = tmp_path / "custom_squash.md"
-        prompt_file.write_text("My custom squash prompt", encoding="utf-8")
+        prompt_file = prompt_files / "custom_squash.md"
         base_config["squash_prompt_file"] = str(prompt_file)
 
         gen = CommitMessageGenerator("tok", base_config, "openai")
@@ -481,36 +562,29 @@ class TestAllNone:
 class TestConfigInstructions:
     """Tests for the _config_instructions helper method."""
 
-    def test_all_enabled(self, base_config):
+    def test_all_enabled(self, shared_generator):
         """All instructions are present when nothing is 'none'."""
-        gen = CommitMessageGenerator("tok", base_config, "openai")
-        instructions = gen._config_instructions()
+        instructions = shared_generator._config_instructions()
 
         assert "English" in instructions
         assert "professional" in instructions
         assert "emojis" in instructions.lower()
 
-    def test_partial_none(self, base_config):
+    def test_partial_none(self, shared_generator):
         """Only non-'none' instructions appear."""
-        base_config["language"] = "none"
-        base_config["emoji"] = "none"
-        gen = CommitMessageGenerator("tok", base_config, "openai")
-
-        instructions = gen._config_instructions()
+        with override_config(shared_generator, language="none", emoji="none") as gen:
+            instructions = gen._config_instructions()
 
         assert "English" not in instructions
         assert "emojis" not in instructions.lower()
         assert "professional" in instructions
 
-    def test_all_none_returns_empty(self, base_config):
+    def test_all_none_returns_empty(self, shared_generator):
         """Empty string when all are 'none'."""
-        base_config["language"] = "none"
-        base_config["style"] = "none"
-        base_config["emoji"] = "none"
-        gen = CommitMessageGenerator("tok", base_config, "openai")
-
-        instructions = gen._config_instructions()
-        assert instructions == ""
+        with override_config(
+            shared_generator, language="none", style="none", emoji="none"
+        ) as gen:
+            assert gen._config_instructions() == ""
 
 
 # ---------------------------------------------------------------------------
@@ -521,27 +595,25 @@ class TestConfigInstructions:
 class TestBuildCommitPromptWithUserFile:
     """Tests for _build_commit_prompt loading from user-defined files."""
 
-    def test_user_file_with_config_instructions(self, tmp_path, base_config):
+    def test_user_file_with_config_instructions(self, prompt_files, base_config):
         """User file content plus config instructions."""
-        prompt_file = tmp_path / "my_prompt.md"
-        prompt_file.write_text("Generate a commit message.", encoding="utf-8")
+        prompt_file = prompt_files / "generate.md"
         base_config["prompt_file"] = str(prompt_file)
 
         gen = CommitMessageGenerator("tok", base_config, "openai")
-        prompt = gen._build_commit_prompt()
+        base, _, suffix = gen._build_commit_prompt().partition("\n\n")
 
-        assert prompt.startswith("Generate a commit message.")
-        assert "English" in prompt
-        assert "professional" in prompt
+        assert base == "Generate a commit message."
+        assert "English" in suffix
+        assert "professional" in suffix
 
-    def test_user_file_without_config_instructions(self, tmp_path, base_config):
+    def test_user_file_without_config_instructions(self, prompt_files, base_config):
         """User file content only when all config is 'none'."""
         base_config["language"] = "none"
         base_config["style"] = "none"
         base_config["emoji"] = "none"
 
-        prompt_file = tmp_path / "my_prompt.md"
-        prompt_file.write_text("Just do this.", encoding="utf-8")
+        prompt_file = prompt_files / "just_do_this.md"
         base_config["prompt_file"] = str(prompt_file)
 
         gen = CommitMessageGenerator("tok", base_config, "openai")
@@ -558,7 +630,9 @@ class TestBuildCommitPromptWithUserFile:
 class TestBuildCommitPromptFullFiles:
     """Tests for _build_commit_prompt switching to the full-files prompt."""
 
-    def test_full_files_uses_hardcoded_full_files_prompt(self, tmp_path, base_config):
+    def test_full_files_uses_hardcoded_full_files_prompt(
+        self, tmp_path, base_config, monkeypatch
+    ):
         """When full_files is True and nothing else is configured, the hardcoded full-files prompt is used."""
         base_config["full_files"] = True
         base_config["prompt_file"] = ""
@@ -566,14 +640,16 @@ class TestBuildCommitPromptFullFiles:
         empty_dir = tmp_path / "no_config"
         empty_dir.mkdir()
 
-        with patch("git_cai_cli.core.llm.CONFIG_DIR", empty_dir):
-            gen = CommitMessageGenerator("tok", base_config, "openai")
-            prompt = gen._build_commit_prompt()
+        monkeypatch.setattr("git_cai_cli.core.llm.CONFIG_DIR", empty_dir)
+        gen = CommitMessageGenerator("tok", base_config, "openai")
+        prompt = gen._build_commit_prompt()
 
         assert "full contents of the affected files" in prompt.lower()
         assert "--- full file contents ---" in prompt.lower()
 
-    def test_full_files_disabled_uses_regular_prompt(self, tmp_path, base_config):
+    def test_full_files_disabled_uses_regular_prompt(
+        self, tmp_path, base_config, monkeypatch
+    ):
         """When full_files is False, the regular commit prompt is selected."""
         base_config["full_files"] = False
         base_config["prompt_file"] = ""
@@ -581,17 +657,16 @@ class TestBuildCommitPromptFullFiles:
         empty_dir = tmp_path / "no_config"
         empty_dir.mkdir()
 
-        with patch("git_cai_cli.core.llm.CONFIG_DIR", empty_dir):
-            gen = CommitMessageGenerator("tok", base_config, "openai")
-            prompt = gen._build_commit_prompt()
+        monkeypatch.setattr("git_cai_cli.core.llm.CONFIG_DIR", empty_dir)
+        gen = CommitMessageGenerator("tok", base_config, "openai")
+        prompt = gen._build_commit_prompt()
 
         # Regular prompt does not mention attached full file contents
         assert "full contents of the affected files" not in prompt.lower()
 
-    def test_full_files_uses_user_override_file(self, tmp_path, base_config):
+    def test_full_files_uses_user_override_file(self, prompt_files, base_config):
         """Custom full_files_prompt_file wins over the default chain."""
-        prompt_file = tmp_path / "my_full.md"
-        prompt_file.write_text("Custom full-files prompt.", encoding="utf-8")
+        prompt_file = prompt_files / "full_files.md"
 
         base_config["full_files"] = True
         base_config["full_files_prompt_file"] = str(prompt_file)
@@ -602,16 +677,16 @@ class TestBuildCommitPromptFullFiles:
         assert prompt.startswith("Custom full-files prompt.")
         assert "English" in prompt
 
-    def test_full_files_hardcoded_fallback(self, tmp_path, base_config):
+    def test_full_files_hardcoded_fallback(self, tmp_path, base_config, monkeypatch):
         """Hardcoded fallback is used when both user file and ~/.config/cai/ file are missing."""
         base_config["full_files"] = True
         base_config["full_files_prompt_file"] = ""
         empty_dir = tmp_path / "no_config"
         empty_dir.mkdir()
 
-        with patch("git_cai_cli.core.llm.CONFIG_DIR", empty_dir):
-            gen = CommitMessageGenerator("tok", base_config, "openai")
-            prompt = gen._build_commit_prompt()
+        monkeypatch.setattr("git_cai_cli.core.llm.CONFIG_DIR", empty_dir)
+        gen = CommitMessageGenerator("tok", base_config, "openai")
+        prompt = gen._build_commit_prompt()
 
         assert prompt.startswith(HARDCODED_FULL_FILES_PROMPT)
 
@@ -624,26 +699,24 @@ class TestBuildCommitPromptFullFiles:
 class TestBuildSquashPromptWithUserFile:
     """Tests for _build_squash_prompt loading from user-defined files."""
 
-    def test_user_file_with_config_instructions(self, tmp_path, base_config):
+    def test_user_file_with_config_instructions(self, prompt_files, base_config):
         """User squash file content plus config instructions."""
-        prompt_file = tmp_path / "my_squash.md"
-        prompt_file.write_text("Summarize commits.", encoding="utf-8")
+        prompt_file = prompt_files / "summarize.md"
         base_config["squash_prompt_file"] = str(prompt_file)
 
         gen = CommitMessageGenerator("tok", base_config, "openai")
-        prompt = gen._build_squash_prompt()
+        base, _, suffix = gen._build_squash_prompt().partition("\n\n")
 
-        assert prompt.startswith("Summarize commits.")
-        assert "English" in prompt
+        assert base == "Summarize commits."
+        assert "English" in suffix
 
-    def test_user_file_without_config_instructions(self, tmp_path, base_config):
+    def test_user_file_without_config_instructions(self, prompt_files, base_config):
         """User squash file content only when all config is 'none'."""
         base_config["language"] = "none"
         base_config["style"] = "none"
         base_config["emoji"] = "none"
 
-        prompt_file = tmp_path / "my_squash.md"
-        prompt_file.write_text("Custom squash only.", encoding="utf-8")
+        prompt_file = prompt_files / "squash_only.md"
         base_config["squash_prompt_file"] = str(prompt_file)
 
         gen = CommitMessageGenerator("tok", base_config, "openai")
@@ -660,41 +733,13 @@ class TestBuildSquashPromptWithUserFile:
 class TestValidateNone:
     """Tests for 'none' value support in validation functions."""
 
-    def test_validate_language_none(self):
-        from git_cai_cli.core.validate import _validate_language
-
-        result = _validate_language({"language": "none"}, {"en", "de"})
-        assert result == "none"
+    @pytest.mark.parametrize("value", ["none", "None", "NONE"])
+    def test_validate_language_none_any_case(self, value):
+        assert _validate_language({"language": value}, {"en", "de"}) == "none"
 
-    def test_validate_language_None_capitalized(self):
-        from git_cai_cli.core.validate import _validate_language
-
-        result = _validate_language({"language": "None"}, {"en", "de"})
-        assert result == "none"
-
-    def test_validate_language_NONE_upper(self):
-        from git_cai_cli.core.validate import _validate_language
-
-        result = _validate_language({"language": "NONE"}, {"en", "de"})
-        assert result == "none"
-
-    def test_validate_style_none(self):
-        from git_cai_cli.core.validate import _validate_style
-
-        result = _validate_style("none")
-        assert result == "none"
-
-    def test_validate_style_None_capitalized(self):
-        from git_cai_cli.core.validate import _validate_style
-
-        result = _validate_style("None")
-        assert result == "none"
-
-    def test_validate_style_NONE_upper(self):
-        from git_cai_cli.core.validate import _validate_style
-
-        result = _validate_style("NONE")
-        assert result == "none"
+    @pytest.mark.parametrize("value", ["none", "None", "NONE"])
+    def test_validate_style_none_any_case(self, value):
+        assert _validate_style(value) == "none"
 
 
 # ---------------------------------------------------------------------------
@@ -706,8 +751,6 @@ class TestConfigKeysPromptFile:
     """Tests that new config keys are accepted by validation."""
 
     def test_prompt_file_accepted(self):
-        from git_cai_cli.core.validate import _validate_config_keys
-
         reference = {
             "openai": {},
             "language": "en",
@@ -734,8 +777,6 @@ class TestConfigKeysPromptFile:
         _validate_config_keys(config, reference)
 
     def test_prompt_file_not_rejected_as_unknown(self):
-        from git_cai_cli.core.validate import _validate_config_keys
-
         reference = {
             "openai": {},
             "language": "en",
@@ -780,9 +821,9 @@ class TestCbeaComplianceCommitPrompt:
             not missing
         ), f"HARDCODED_COMMIT_PROMPT is missing cbea.ms markers: {missing}"
 
-    def test_hardcoded_commit_prompt_retains_secret_warning(self):
+    def test_hardcoded_commit_prompt_retains_secret_warning(self, lowered_prompts):
         # Secret-detection guidance is commit-only and must be preserved
-        lower = HARDCODED_COMMIT_PROMPT.lower()
+        lower = lowered_prompts["commit"]
         assert "sensitive" in lower or "secret" in lower or "token" in lower
 
 
@@ -797,8 +838,8 @@ class TestCbeaComplianceFullFilesPrompt:
             not missing
         ), f"HARDCODED_FULL_FILES_PROMPT is missing cbea.ms markers: {missing}"
 
-    def test_hardcoded_full_files_prompt_retains_secret_warning(self):
-        lower = HARDCODED_FULL_FILES_PROMPT.lower()
+    def test_hardcoded_full_files_prompt_retains_secret_warning(self, lowered_prompts):
+        lower = lowered_prompts["full_files"]
         assert "sensitive" in lower or "secret" in lower or "token" in lower
 
 
@@ -821,20 +862,20 @@ class TestDocsOnlyRuleInHardcodedPrompts:
     """All three commit-style hardcoded prompts must guide the LLM to treat
     documentation-only diffs as documentation, not as features or fixes."""
 
-    def test_hardcoded_commit_prompt_mentions_docs_only_rule(self):
+    def test_hardcoded_commit_prompt_mentions_docs_only_rule(self, lowered_prompts):
         assert "*.md" in HARDCODED_COMMIT_PROMPT
         assert "docs/" in HARDCODED_COMMIT_PROMPT
-        assert "documentation" in HARDCODED_COMMIT_PROMPT.lower()
+        assert "documentation" in lowered_prompts["commit"]
 
-    def test_hardcoded_full_files_prompt_mentions_docs_only_rule(self):
+    def test_hardcoded_full_files_prompt_mentions_docs_only_rule(self, lowered_prompts):
         assert "*.md" in HARDCODED_FULL_FILES_PROMPT
         assert "docs/" in HARDCODED_FULL_FILES_PROMPT
-        assert "documentation" in HARDCODED_FULL_FILES_PROMPT.lower()
+        assert "documentation" in lowered_prompts["full_files"]
 
-    def test_hardcoded_squash_prompt_mentions_docs_only_rule(self):
+    def test_hardcoded_squash_prompt_mentions_docs_only_rule(self, lowered_prompts):
         assert "*.md" in HARDCODED_SQUASH_PROMPT
         assert "docs/" in HARDCODED_SQUASH_PROMPT
-        assert "documentation" in HARDCODED_SQUASH_PROMPT.lower()
+        assert "documentation" in lowered_prompts["squash"]
 
 
 class TestHardcodedPrPrompt:
@@ -873,10 +914,9 @@ class TestConventionalInstructionDocsRule:
     def test_conventional_instruction_requires_docs_type_for_doc_only_changes(
         self, base_config
     ):
-        config = dict(base_config)
-        config["conventional"] = True
+        base_config["conventional"] = True
         gen = CommitMessageGenerator(
-            token="fake-token", config=config, default_model="openai"
+            token="fake-token", config=base_config, default_model="openai"
         )
         instr = gen._conventional_instruction()
         assert "docs" in instr
@@ -884,10 +924,9 @@ class TestConventionalInstructionDocsRule:
         assert "*.md" in instr
 
     def test_conventional_instruction_empty_when_disabled(self, base_config):
-        config = dict(base_config)
-        config["conventional"] = False
+        base_config["conventional"] = False
         gen = CommitMessageGenerator(
-            token="fake-token", config=config, default_model="openai"
+            token="fake-token", config=base_config, default_model="openai"
         )
         assert gen._conventional_instruction() == ""
 
@@ -903,10 +942,9 @@ class TestLanguageStyleEmojiCoverAllPrompts:
     and PR. Regression guard: each new prompt builder must opt in."""
 
     def _make_gen(self, base_config, **overrides):
-        config = dict(base_config)
-        config.update(overrides)
+        base_config.update(overrides)
         return CommitMessageGenerator(
-            token="fake-token", config=config, default_model="openai"
+            token="fake-token", config=base_config, default_model="openai"
         )
 
     def test_commit_prompt_honors_language_style_emoji(self, base_config):
@@ -956,17 +994,15 @@ class TestPromptBaseSuffixJoin:
     visually separates it from the suffix."""
 
     def _make_gen(self, base_config, prompt_file_key, prompt_path):
-        config = dict(base_config)
-        config[prompt_file_key] = str(prompt_path)
+        base_config[prompt_file_key] = str(prompt_path)
         return CommitMessageGenerator(
-            token="fake-token", config=config, default_model="openai"
+            token="fake-token", config=base_config, default_model="openai"
         )
 
     def test_commit_prompt_uses_blank_line_between_base_and_suffix(
-        self, tmp_path, base_config
+        self, prompt_files, base_config
     ):
-        prompt_file = tmp_path / "base.md"
-        prompt_file.write_text("Base prompt body.\n", encoding="utf-8")
+        prompt_file = prompt_files / "base.md"
         gen = self._make_gen(base_config, "prompt_file", prompt_file)
 
         prompt = gen._build_commit_prompt()
@@ -976,10 +1012,9 @@ class TestPromptBaseSuffixJoin:
         assert "Base prompt body.\n " not in prompt
 
     def test_squash_prompt_uses_blank_line_between_base_and_suffix(
-        self, tmp_path, base_config
+        self, prompt_files, base_config
     ):
-        prompt_file = tmp_path / "squash_base.md"
-        prompt_file.write_text("Squash base body.\n", encoding="utf-8")
+        prompt_file = prompt_files / "squash_base.md"
         gen = self._make_gen(base_config, "squash_prompt_file", prompt_file)
 
         prompt = gen._build_squash_prompt()
@@ -988,10 +1023,9 @@ class TestPromptBaseSuffixJoin:
         assert "Squash base body. " not in prompt
 
     def test_pr_prompt_uses_blank_line_between_base_and_suffix(
-        self, tmp_path, base_config
+        self, prompt_files, base_config
     ):
-        prompt_file = tmp_path / "pr_base.md"
-        prompt_file.write_text("PR base body.\n", encoding="utf-8")
+        prompt_file = prompt_files / "pr_base.md"
         gen = self._make_gen(base_config, "pr_prompt_file", prompt_file)
 
         prompt = gen._build_pr_prompt()
@@ -1006,9 +1040,7 @@ class TestPromptBaseSuffixJoin:
 
 
 def test_prompt_file_key_by_kind_covers_new_modes():
-    from git_cai_cli.core.llm import CommitMessageGenerator as _Gen
-
-    mapping = _Gen._PROMPT_FILE_KEY_BY_KIND
+    mapping = CommitMessageGenerator._PROMPT_FILE_KEY_BY_KIND
     assert mapping["explain"] == "explain_prompt_file"
     assert mapping["split"] == "split_prompt_file"
     assert mapping["changelog"] == "changelog_prompt_file"
@@ -1016,13 +1048,6 @@ def test_prompt_file_key_by_kind_covers_new_modes():
 
 
 def test_new_hardcoded_prompts_are_nonempty():
-    from git_cai_cli.core.prompts_fallback import (
-        HARDCODED_CHANGELOG_PROMPT,
-        HARDCODED_EXPLAIN_PROMPT,
-        HARDCODED_RELEASE_PROMPT,
-        HARDCODED_SPLIT_PROMPT,
-    )
-
     for prompt in (
         HARDCODED_EXPLAIN_PROMPT,
         HARDCODED_SPLIT_PROMPT,
@@ -1034,9 +1059,6 @@ def test_new_hardcoded_prompts_are_nonempty():
 
 def test_new_prompt_config_keys_are_registered():
     """The new prompt/changelog keys must be settable in a repo config."""
-    from git_cai_cli.core.config import DEFAULT_CONFIG
-    from git_cai_cli.core.validate import ALLOWED_GLOBAL_KEYS
-
     for key in (
         "changelog_file_name",
         "changelog_prompt_file",
@@ -0,0 +1,55 @@
+"""Opt-in on-disk LLM response cache."""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import pytest
+from git_cai_cli.core import response_cache
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> Path:
+    return tmp_path / "responses.db"
+
+
+def test_is_enabled_defaults_to_false():
+    assert response_cache.is_enabled(None) is False
+    assert response_cache.is_enabled({}) is False
+    assert response_cache.is_enabled({"response_cache": True}) is True
+
+
+def test_make_key_separates_parts():
+    assert response_cache.make_key("ab", "c") != response_cache.make_key("a", "bc")
+    assert response_cache.make_key("a", "b") == response_cache.make_key("a", "b")
+
+
+def test_put_then_get_roundtrip(db_path):
+    key = response_cache.make_key("openai", "gpt", "diff")
+    assert response_cache.get(key, db_path=db_path) is None
+    response_cache.put(key, "feat: add cache", db_path=db_path)
+    assert response_cache.get(key, db_path=db_path) == "feat: add cache"
+
+
+def test_expired_entries_are_ignored(db_path, monkeypatch):
+    key = response_cache.make_key("diff")
+    response_cache.put(key, "old", db_path=db_path)
+    later = time.time() + response_cache.TTL_SECONDS + 1
+    monkeypatch.setattr(response_cache.time, "time", lambda: later)
+    assert response_cache.get(key, db_path=db_path) is None
+
+
+def test_default_db_path_honours_xdg_cache_home(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert response_cache.default_db_path() == tmp_path / "git-cai" / "responses.db"
+
+
+def test_write_failure_is_swallowed(tmp_path):
+    # A regular file where the parent directory should be makes mkdir fail.
+    blocker = tmp_path / "blocker"
+    blocker.write_text("x")
+    db = blocker / "responses.db"
+
+    assert response_cache.put("k", "v", db_path=db) is None  # must not raise
+    assert response_cache.get("k", db_path=db) is None
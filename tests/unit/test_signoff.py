@@ -16,10 +16,9 @@ def _identity_runner(name: str, email: str):
 
     def runner(cmd, *args, **kwargs):
         result = MagicMock()
-        if cmd == ["git", "config", "--get", "user.name"]:
-            result.stdout = f"{name}\n"
-        elif cmd == ["git", "config", "--get", "user.email"]:
-            result.stdout = f"{email}\n"
+        if cmd == ["git", "config", "--get-regexp", r"^user\.(name|email)$"]:
+            lines = [f"user.name {name}" if name else "", f"user.email {email}"]
+            result.stdout = "\n".join(line for line in lines if line.strip()) + "\n"
         else:
             result.stdout = ""
         return result
@@ -38,10 +37,7 @@ def test_get_git_identity_returns_name_and_email():
 def test_get_git_identity_strips_whitespace():
     def runner(cmd, *args, **kwargs):
         result = MagicMock()
-        if cmd[-1] == "user.name":
-            result.stdout = "  Bob  \n"
-        else:
-            result.stdout = "  bob@example.com\n"
+        result.stdout = "user.name   Bob  \nuser.email  bob@example.com\n"
         return result
 
     name, email = get_git_identity(run_cmd=runner)
@@ -61,6 +57,16 @@ def test_get_git_identity_raises_on_missing_email():
         get_git_identity(run_cmd=runner)
 
 
+def test_get_git_identity_uses_one_git_process():
+    runner = MagicMock(
+        return_value=MagicMock(
+            stdout="user.name Old\nuser.email a@example.com\nuser.name Alice Smith\n"
+        )
+    )
+    assert get_git_identity(run_cmd=runner) == ("Alice Smith", "a@example.com")
+    runner.assert_called_once()
+
+
 def test_append_signoff_adds_trailer_with_blank_line_separator():
     msg = "Fix typo in config loader"
     out = append_signoff(msg, identity=("Alice", "alice@example.com"))
@@ -2,11 +2,11 @@
 Unit tests for git_cai_cli.core.squash.squash_branch function.
 """
 
-import builtins
 import subprocess
 import typing
 from pathlib import Path
-from unittest.mock import MagicMock, call, patch
+from types import SimpleNamespace
+from unittest.mock import DEFAULT, MagicMock, Mock, call, patch
 
 import pytest
 from git_cai_cli.core.squash import (
@@ -16,95 +16,125 @@ from git_cai_cli.core.squash import (
     squash_branch,
 )
 
-
-@pytest.fixture
-def mock_repo_root() -> Path:
-    """
-    Fixture that simulates a Git repository root path.
-    """
-    return Path("/fake/repo")
+# Simulated Git repository root path.
+MOCK_REPO_ROOT = Path("/fake/repo")
 
 
 @pytest.fixture
-def mock_generator() -> MagicMock:
+def mock_generator() -> SimpleNamespace:
     """
-    Fixture that simulates a commit message generator.
+    Fixture that simulates a commit message generator. Only the methods
+    squash_branch calls exist, so a new dependency fails loudly.
     """
-    gen = MagicMock()
-    # New API: callers build the request before the spinner, then `send` it.
-    # Dispatch the mocked result by content so both flows (staged-commit
-    # message and squash summary) return the right thing regardless of order.
-    gen.build_commit_request.return_value = ("commit-content", "commit-prompt")
-    gen.build_squash_request.return_value = ("squash-content", "squash-prompt")
-    gen.send.side_effect = lambda content, _prompt: (
-        "commit message" if content == "commit-content" else "squash summary"
+    # Callers build the request before the spinner, then `send` it. Dispatch
+    # the mocked result by content so both flows (staged-commit message and
+    # squash summary) return the right thing regardless of order.
+    return SimpleNamespace(
+        build_commit_request=Mock(return_value=("commit-content", "commit-prompt")),
+        build_squash_request=Mock(return_value=("squash-content", "squash-prompt")),
+        send=Mock(
+            side_effect=lambda content, _prompt: (
+                "commit message" if content == "commit-content" else "squash summary"
+            )
+        ),
+        set_changed_files=Mock(),
+        record_elapsed=Mock(),
+        close=Mock(),
     )
-    # Legacy methods kept for any test that calls them directly.
-    gen.generate.return_value = "commit message"
-    gen.summarize_commit_history.return_value = "squash summary"
-    return gen
 
 
-@pytest.fixture
-def clean_git_state() -> typing.Callable:
+# check_output replies keyed by the first three argv items: a clean worktree
+# on a branch with two commits ...
+_CLEAN_WORKTREE = {
+    ("git", "rev-parse", "--is-shallow-repository"): "false",
+    ("git", "diff", "--cached"): "",
+    ("git", "diff", "--name-only"): "",
+    ("git", "--no-pager", "log"): "commit 1\ncommit 2",
+}
+# ... and the lookups _get_branch_base uses to find where it diverged.
+_BRANCH_BASE = {
+    ("git", "symbolic-ref", "refs/remotes/origin/HEAD"): "refs/remotes/origin/main",
+    ("git", "merge-base", "--fork-point"): "BASE",
+}
+_STAGED_KEY = ("git", "diff", "--cached")
+
+
+def _fake_git(outputs: dict) -> typing.Callable:
     """
-    Simulates a clean working tree and a multi-commit branch.
+    Builds a subprocess.check_output side effect that answers from ``outputs``.
     """
 
-    def _side_effect(cmd, text=True) -> str:
-        """
-        Simulates subprocess.check_output side effects for a clean Git state.
-        """
-        if cmd[:3] == ["git", "rev-parse", "--is-shallow-repository"]:
-            return "false"
-        if cmd[:3] == ["git", "diff", "--cached"]:
-            return ""
-        if cmd[:2] == ["git", "diff"]:
-            return ""
-        if cmd[:2] == ["git", "--no-pager"] and "log" in cmd:
-            return "commit 1\ncommit 2"
-        if "merge-base" in cmd:
-            return "BASE"
-        if "symbolic-ref" in cmd:
-            return "refs/remotes/origin/main"
-        raise AssertionError(f"Unexpected git command: {cmd}")
+    def _side_effect(cmd, text=True, **kwargs) -> str:
+        try:
+            return outputs[tuple(cmd[:3])]
+        except KeyError:
+            raise AssertionError(f"Unexpected git command: {cmd}") from None
 
     return _side_effect
 
 
-def test_aborts_if_not_in_git_repo(caplog) -> None:
+# Simulates a clean working tree and a multi-commit branch.
+_clean_git_state = _fake_git({**_CLEAN_WORKTREE, **_BRANCH_BASE})
+
+
+@pytest.fixture
+def squash_patches(mock_generator):
+    """
+    Patches every collaborator of squash_branch for a clean multi-commit
+    branch without upstream. Yields a namespace of the mocks so tests only
+    override what their scenario changes.
+    """
+    with (
+        patch.multiple(
+            "git_cai_cli.core.squash",
+            find_git_root=DEFAULT,
+            load_config=DEFAULT,
+            load_token=DEFAULT,
+            CommitMessageGenerator=DEFAULT,
+            get_git_editor=DEFAULT,
+            sha256_of_file=DEFAULT,
+            _has_upstream=DEFAULT,
+        ) as mocks,
+        patch("subprocess.check_output", side_effect=_clean_git_state) as check_output,
+        patch("subprocess.run", return_value=subprocess.CompletedProcess([], 0)) as run,
+    ):
+        mocks["find_git_root"].return_value = MOCK_REPO_ROOT
+        mocks["load_config"].return_value = {"default": "openai"}
+        mocks["load_token"].return_value = "token"
+        mocks["CommitMessageGenerator"].return_value = mock_generator
+        mocks["get_git_editor"].return_value = "true"
+        mocks["sha256_of_file"].side_effect = ["a", "b"]
+        mocks["_has_upstream"].return_value = False
+        yield SimpleNamespace(**mocks, check_output=check_output, run=run)
+
+
+def test_aborts_if_not_in_git_repo(squash_patches, caplog) -> None:
     """
     Test that squash_branch logs an error if not in a Git repository.
     """
-    with patch("git_cai_cli.core.squash.find_git_root", return_value=None):
-        squash_branch()
+    squash_patches.find_git_root.return_value = None
+
+    squash_branch()
 
     assert "Not inside a Git repository" in caplog.text
 
 
-def test_aborts_on_unstaged_changes(mock_repo_root) -> None:
+def test_aborts_on_unstaged_changes(squash_patches) -> None:
     """
     Test that squash_branch aborts if there are unstaged changes.
     """
-    with (
-        patch("git_cai_cli.core.squash.find_git_root", return_value=mock_repo_root),
-        patch(
-            "subprocess.check_output",
-            side_effect=[
-                "false",  # is-shallow-repository
-                "",  # staged
-                "file.py",  # unstaged
-            ],
-        ),
-        patch(
-            "git_cai_cli.core.squash.load_config", return_value={"default": "openai"}
-        ),
-        patch("git_cai_cli.core.squash.load_token", return_value="token"),
-    ):
-        squash_branch()
+    squash_patches.check_output.side_effect = [
+        "false",  # is-shallow-repository
+        "",  # staged
+        "file.py",  # unstaged
+    ]
 
+    squash_branch()
 
-def test_squash_classifies_auth_error(mock_repo_root, clean_git_state, caplog) -> None:
+    squash_patches.run.assert_not_called()
+
+
+def test_squash_classifies_auth_error(squash_patches, caplog) -> None:
     """A 401 from the provider during history summarization must surface as a
     friendly message + clean exit, not an uncaught requests.HTTPError."""
     import requests
@@ -117,196 +147,103 @@ def test_squash_classifies_auth_error(mock_repo_root, clean_git_state, caplog) -
     gen.build_commit_request.return_value = ("content", "prompt")
     gen.build_squash_request.return_value = ("content", "prompt")
     gen.send.side_effect = requests.HTTPError(response=resp)
+    squash_patches.CommitMessageGenerator.return_value = gen
 
-    with (
-        patch("git_cai_cli.core.squash.find_git_root", return_value=mock_repo_root),
-        patch("subprocess.check_output", side_effect=clean_git_state),
-        patch(
-            "git_cai_cli.core.squash.load_config", return_value={"default": "openai"}
-        ),
-        patch("git_cai_cli.core.squash.load_token", return_value="token"),
-        patch("git_cai_cli.core.squash.CommitMessageGenerator", return_value=gen),
-        pytest.raises(SystemExit),
-    ):
+    with pytest.raises(SystemExit):
         squash_branch()
 
     assert "invalid or not authorized" in caplog.text
 
 
-def test_commits_staged_changes_first(mock_repo_root, mock_generator) -> None:
-    """
-    Test that squash_branch commits staged changes before squashing.
-    """
-
-    def git_side_effect(cmd, text=True, **kwargs) -> str:
-        """
-        Simulates subprocess.check_output side effects for staged changes.
-        """
-        if cmd[:3] == ["git", "rev-parse", "--is-shallow-repository"]:
-            return "false"
-        if cmd[:3] == ["git", "diff", "--cached"]:
-            return "file.py"
-        if cmd[:2] == ["git", "diff"]:
-            return ""
-        if cmd[:2] == ["git", "--no-pager"] and "log" in cmd:
-            return "commit 1\ncommit 2"
-        if "merge-base" in cmd:
-            return "BASE"
-        if "symbolic-ref" in cmd:
-            return "refs/remotes/origin/main"
-        raise AssertionError(f"Unexpected git command: {cmd}")
-
-    with (
-        patch("git_cai_cli.core.squash.find_git_root", return_value=mock_repo_root),
-        patch("git_cai_cli.core.squash.git_diff_excluding", return_value="diff"),
-        patch("subprocess.check_output", side_effect=git_side_effect),
-        patch(
-            "git_cai_cli.core.squash.commit_with_edit_template", return_value=0
-        ) as commit,
-        patch(
-            "git_cai_cli.core.squash.load_config", return_value={"default": "openai"}
-        ),
-        patch("git_cai_cli.core.squash.load_token", return_value="token"),
-        patch(
-            "git_cai_cli.core.squash.CommitMessageGenerator",
-            return_value=mock_generator,
-        ),
-        patch("git_cai_cli.core.squash.get_git_editor", return_value="true"),
-        patch("git_cai_cli.core.squash.sha256_of_file", side_effect=["a", "b"]),
-        patch("git_cai_cli.core.squash._has_upstream", return_value=False),
-        patch("subprocess.run", return_value=MagicMock(returncode=0)),
-    ):
-        squash_branch()
-
-    commit.assert_called_once()
+_RESET = call(["git", "reset", "--soft", "BASE"], check=True)
+_SQUASH_COMMIT = call(["git", "commit", "-m", "squash summary"], check=True)
+_FORCE_PUSH = call(
+    ["git", "push", "--force-with-lease"],
+    capture_output=True,
+    text=True,
+    check=False,
+)
 
 
-def test_cancels_if_editor_exits_nonzero(
-    mock_repo_root, clean_git_state, mock_generator
-) -> None:
-    """
-    Test that squash_branch cancels if the git editor exits with non-zero.
-    """
-    with (
-        patch("git_cai_cli.core.squash.find_git_root", return_value=mock_repo_root),
-        patch("subprocess.check_output", side_effect=clean_git_state),
-        patch(
-            "git_cai_cli.core.squash.load_config", return_value={"default": "openai"}
+@pytest.mark.parametrize(
+    "staged, editor_rc, has_upstream, expected_git_calls",
+    [
+        pytest.param("", 0, False, [_RESET, _SQUASH_COMMIT], id="soft_reset"),
+        pytest.param(
+            "file.py", 0, False, [_RESET, _SQUASH_COMMIT], id="staged_commits_first"
         ),
-        patch("git_cai_cli.core.squash.load_token", return_value="token"),
-        patch(
-            "git_cai_cli.core.squash.CommitMessageGenerator",
-            return_value=mock_generator,
+        pytest.param("", 1, False, [], id="editor_cancel"),
+        pytest.param(
+            "", 0, True, [_RESET, _SQUASH_COMMIT, _FORCE_PUSH], id="force_push"
         ),
-        patch("git_cai_cli.core.squash.get_git_editor", return_value="false"),
-        patch("git_cai_cli.core.squash.sha256_of_file", return_value="hash"),
-        patch("subprocess.run", return_value=MagicMock(returncode=1)),
-    ):
-        squash_branch()
-
-
-def test_performs_soft_reset_and_commit(
-    mock_repo_root, clean_git_state, mock_generator
+    ],
+)
+def test_squash_scenarios(
+    squash_patches,
+    monkeypatch,
+    caplog,
+    staged,
+    editor_rc,
+    has_upstream,
+    expected_git_calls,
 ) -> None:
     """
-    Test that squash_branch performs a soft reset and creates the squash commit.
+    Staged changes are committed first, a non-zero editor exit cancels, and
+    a branch with upstream is force-pushed after the soft reset and commit.
     """
-    run_mock = MagicMock(return_value=MagicMock(returncode=0))
-
-    with (
-        patch("git_cai_cli.core.squash.find_git_root", return_value=mock_repo_root),
-        patch("subprocess.check_output", side_effect=clean_git_state),
-        patch(
-            "git_cai_cli.core.squash.load_config", return_value={"default": "openai"}
-        ),
-        patch("git_cai_cli.core.squash.load_token", return_value="token"),
-        patch(
-            "git_cai_cli.core.squash.CommitMessageGenerator",
-            return_value=mock_generator,
-        ),
-        patch("git_cai_cli.core.squash.get_git_editor", return_value="true"),
-        patch("git_cai_cli.core.squash.sha256_of_file", side_effect=["a", "b"]),
-        patch("subprocess.run", run_mock),
-        patch("git_cai_cli.core.squash._has_upstream", return_value=False),
-    ):
-        squash_branch()
-
-    run_mock.assert_has_calls(
-        [
-            call(["git", "reset", "--soft", "BASE"], check=True),
-            call(["git", "commit", "-m", "squash summary"], check=True),
-        ],
-        any_order=False,
+    squash_patches.check_output.side_effect = _fake_git(
+        {**_CLEAN_WORKTREE, **_BRANCH_BASE, _STAGED_KEY: staged}
     )
 
+    def run_side_effect(cmd, *args, **kwargs):
+        # Only the editor (get_git_editor() -> "true") exits with editor_rc;
+        # git calls such as the _has_commits HEAD probe succeed.
+        rc = editor_rc if cmd[0] == "true" else 0
+        return subprocess.CompletedProcess(cmd, rc)
 
-def test_force_push_prompt_and_execution(
-    mock_repo_root, clean_git_state, mock_generator
-) -> None:
-    """
-    Test that squash_branch prompts for and performs force push when upstream exists.
-    """
-    run_mock = MagicMock(return_value=MagicMock(returncode=0))
+    squash_patches.run.side_effect = run_side_effect
+    squash_patches._has_upstream.return_value = has_upstream
+    monkeypatch.setattr("builtins.input", lambda prompt="": "yes")
 
     with (
-        patch("git_cai_cli.core.squash.find_git_root", return_value=mock_repo_root),
-        patch("subprocess.check_output", side_effect=clean_git_state),
-        patch(
-            "git_cai_cli.core.squash.load_config", return_value={"default": "openai"}
-        ),
-        patch("git_cai_cli.core.squash.load_token", return_value="token"),
+        patch("git_cai_cli.core.squash.git_diff_excluding", return_value="diff"),
         patch(
-            "git_cai_cli.core.squash.CommitMessageGenerator",
-            return_value=mock_generator,
-        ),
-        patch("git_cai_cli.core.squash.get_git_editor", return_value="true"),
-        patch("git_cai_cli.core.squash.sha256_of_file", side_effect=["a", "b"]),
-        patch("subprocess.run", run_mock),
-        patch("git_cai_cli.core.squash._has_upstream", return_value=True),
-        patch.object(builtins, "input", return_value="yes"),
+            "git_cai_cli.core.squash.commit_with_edit_template", return_value=0
+        ) as commit,
     ):
+        caplog.set_level("INFO")
         squash_branch()
 
-    run_mock.assert_any_call(
-        ["git", "push", "--force-with-lease"],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
+    assert any(c.args[0][0] == "true" for c in squash_patches.run.call_args_list)
+    cancelled = "Editor exited non-zero — squash cancelled." in caplog.messages
+    assert cancelled == (editor_rc != 0)
+    assert commit.call_count == (1 if staged else 0)
+    # Only the history-rewriting calls; the HEAD probe and editor are incidental.
+    git_calls = [
+        c
+        for c in squash_patches.run.call_args_list
+        if c.args[0][:2] in (["git", "reset"], ["git", "commit"], ["git", "push"])
+    ]
+    assert git_calls == expected_git_calls
 
 
-def test_force_push_failure_is_handled(
-    mock_repo_root, clean_git_state, mock_generator, caplog
-) -> None:
+def test_force_push_failure_is_handled(squash_patches, monkeypatch, caplog) -> None:
     """
     Test that a failed force push is reported gracefully without raising.
     """
 
     def run_side_effect(cmd, *args, **kwargs):
         if cmd[:2] == ["git", "push"]:
-            return MagicMock(returncode=1, stderr="! [rejected] (stale info)")
-        return MagicMock(returncode=0)
+            return subprocess.CompletedProcess(
+                cmd, 1, stderr="! [rejected] (stale info)"
+            )
+        return subprocess.CompletedProcess(cmd, 0)
 
-    run_mock = MagicMock(side_effect=run_side_effect)
+    squash_patches.run.side_effect = run_side_effect
+    squash_patches._has_upstream.return_value = True
+    monkeypatch.setattr("builtins.input", lambda prompt="": "yes")
 
-    with (
-        patch("git_cai_cli.core.squash.find_git_root", return_value=mock_repo_root),
-        patch("subprocess.check_output", side_effect=clean_git_state),
-        patch(
-            "git_cai_cli.core.squash.load_config", return_value={"default": "openai"}
-        ),
-        patch("git_cai_cli.core.squash.load_token", return_value="token"),
-        patch(
-            "git_cai_cli.core.squash.CommitMessageGenerator",
-            return_value=mock_generator,
-        ),
-        patch("git_cai_cli.core.squash.get_git_editor", return_value="true"),
-        patch("git_cai_cli.core.squash.sha256_of_file", side_effect=["a", "b"]),
-        patch("subprocess.run", run_mock),
-        patch("git_cai_cli.core.squash._has_upstream", return_value=True),
-        patch.object(builtins, "input", return_value="yes"),
-    ):
-        squash_branch()
+    squash_branch()
 
     assert "Push failed" in caplog.text
 
@@ -314,6 +251,24 @@ def test_force_push_failure_is_handled(
 # --- Tests for new squash argument helpers ---
 
 
+@pytest.fixture
+def commit_counts():
+    """
+    Patches the commit-count helpers behind _resolve_squash_target: 20
+    commits in the repo, 3 of them on a branch that diverged at BASE.
+    """
+    with patch.multiple(
+        "git_cai_cli.core.squash",
+        _count_total_commits=DEFAULT,
+        _get_branch_base=DEFAULT,
+        _count_commits_on_branch=DEFAULT,
+    ) as mocks:
+        mocks["_count_total_commits"].return_value = 20
+        mocks["_get_branch_base"].return_value = "BASE"
+        mocks["_count_commits_on_branch"].return_value = 3
+        yield SimpleNamespace(**mocks)
+
+
 def test_count_commits_on_branch() -> None:
     with patch("subprocess.check_output", return_value="5\n"):
         assert _count_commits_on_branch("BASE") == 5
@@ -324,48 +279,41 @@ def test_count_total_commits() -> None:
         assert _count_total_commits() == 42
 
 
-def test_resolve_squash_target_with_number() -> None:
+def test_resolve_squash_target_with_number(commit_counts) -> None:
     """Squash last N commits resolves to HEAD~N."""
-    with (
-        patch("git_cai_cli.core.squash._count_total_commits", return_value=10),
-        patch("git_cai_cli.core.squash._get_branch_base", return_value="BASE"),
-        patch("git_cai_cli.core.squash._count_commits_on_branch", return_value=8),
-        patch("subprocess.check_output", return_value="abc123\n"),
-    ):
+    commit_counts._count_total_commits.return_value = 10
+    commit_counts._count_commits_on_branch.return_value = 8
+
+    with patch("subprocess.check_output", return_value="abc123\n"):
         result = _resolve_squash_target("3")
     assert result == "abc123"
 
 
-def test_resolve_squash_target_number_exceeds_total(caplog) -> None:
+def test_resolve_squash_target_number_exceeds_total(commit_counts) -> None:
     """Error when count exceeds total commits in repo."""
-    with (
-        patch("git_cai_cli.core.squash._count_total_commits", return_value=5),
-        pytest.raises(SystemExit),
-    ):
+    commit_counts._count_total_commits.return_value = 5
+
+    with pytest.raises(SystemExit):
         _resolve_squash_target("10")
 
 
-def test_resolve_squash_target_number_exceeds_branch_warns() -> None:
+def test_resolve_squash_target_number_exceeds_branch_warns(
+    commit_counts, monkeypatch
+) -> None:
     """Warning when count exceeds branch commits, user declines."""
-    with (
-        patch("git_cai_cli.core.squash._count_total_commits", return_value=20),
-        patch("git_cai_cli.core.squash._get_branch_base", return_value="BASE"),
-        patch("git_cai_cli.core.squash._count_commits_on_branch", return_value=3),
-        patch.object(builtins, "input", return_value="no"),
-        pytest.raises(SystemExit),
-    ):
+    monkeypatch.setattr("builtins.input", lambda prompt="": "no")
+
+    with pytest.raises(SystemExit):
         _resolve_squash_target("5")
 
 
-def test_resolve_squash_target_number_exceeds_branch_continues() -> None:
+def test_resolve_squash_target_number_exceeds_branch_continues(
+    commit_counts, monkeypatch
+) -> None:
     """Warning when count exceeds branch commits, user confirms."""
-    with (
-        patch("git_cai_cli.core.squash._count_total_commits", return_value=20),
-        patch("git_cai_cli.core.squash._get_branch_base", return_value="BASE"),
-        patch("git_cai_cli.core.squash._count_commits_on_branch", return_value=3),
-        patch.object(builtins, "input", return_value="yes"),
-        patch("subprocess.check_output", return_value="def456\n"),
-    ):
+    monkeypatch.setattr("builtins.input", lambda prompt="": "yes")
+
+    with patch("subprocess.check_output", return_value="def456\n"):
         result = _resolve_squash_target("5")
     assert result == "def456"
 
@@ -377,10 +325,7 @@ def test_resolve_squash_target_with_valid_hash() -> None:
             "subprocess.check_output",
             side_effect=["full_hash\n", "parent_hash\n"],
         ),
-        patch(
-            "subprocess.run",
-            return_value=MagicMock(returncode=0),
-        ),
+        patch("subprocess.run", return_value=subprocess.CompletedProcess([], 0)),
     ):
         result = _resolve_squash_target("abc123")
     assert result == "parent_hash"
@@ -402,10 +347,7 @@ def test_resolve_squash_target_hash_not_in_branch() -> None:
     """Error when commit exists but is not in current branch."""
     with (
         patch("subprocess.check_output", return_value="full_hash\n"),
-        patch(
-            "subprocess.run",
-            return_value=MagicMock(returncode=1),
-        ),
+        patch("subprocess.run", return_value=subprocess.CompletedProcess([], 1)),
         pytest.raises(SystemExit),
     ):
         _resolve_squash_target("abc123")
@@ -423,36 +365,13 @@ def test_resolve_squash_target_negative_count() -> None:
         _resolve_squash_target("-3")
 
 
-def test_squash_branch_with_squash_arg(mock_repo_root, mock_generator) -> None:
+def test_squash_branch_with_squash_arg(squash_patches) -> None:
     """Test that squash_branch uses _resolve_squash_target when squash_arg is provided."""
-    run_mock = MagicMock(return_value=MagicMock(returncode=0))
-
-    def git_side_effect(cmd, text=True, **kwargs) -> str:
-        if cmd[:3] == ["git", "rev-parse", "--is-shallow-repository"]:
-            return "false"
-        if cmd[:3] == ["git", "diff", "--cached"]:
-            return ""
-        if cmd[:2] == ["git", "diff"]:
-            return ""
-        if cmd[:2] == ["git", "--no-pager"] and "log" in cmd:
-            return "commit 1\ncommit 2"
-        raise AssertionError(f"Unexpected git command: {cmd}")
+
+    # No branch-base lookups: the explicit target replaces them.
+    squash_patches.check_output.side_effect = _fake_git(_CLEAN_WORKTREE)
 
     with (
-        patch("git_cai_cli.core.squash.find_git_root", return_value=mock_repo_root),
-        patch("subprocess.check_output", side_effect=git_side_effect),
-        patch(
-            "git_cai_cli.core.squash.load_config", return_value={"default": "openai"}
-        ),
-        patch("git_cai_cli.core.squash.load_token", return_value="token"),
-        patch(
-            "git_cai_cli.core.squash.CommitMessageGenerator",
-            return_value=mock_generator,
-        ),
-        patch("git_cai_cli.core.squash.get_git_editor", return_value="true"),
-        patch("git_cai_cli.core.squash.sha256_of_file", side_effect=["a", "b"]),
-        patch("subprocess.run", run_mock),
-        patch("git_cai_cli.core.squash._has_upstream", return_value=False),
         patch("git_cai_cli.core.squash._has_commits", return_value=True),
         patch(
             "git_cai_cli.core.squash._resolve_squash_target",
@@ -462,7 +381,7 @@ def test_squash_branch_with_squash_arg(mock_repo_root, mock_generator) -> None:
         squash_branch(squash_arg="3")
 
     resolve_mock.assert_called_once_with("3")
-    run_mock.assert_has_calls(
+    squash_patches.run.assert_has_calls(
         [
             call(["git", "reset", "--soft", "TARGET_HASH"], check=True),
             call(["git", "commit", "-m", "squash summary"], check=True),
@@ -471,28 +390,10 @@ def test_squash_branch_with_squash_arg(mock_repo_root, mock_generator) -> None:
     )
 
 
-def test_squash_branch_passes_context_to_generator(
-    mock_generator, mock_repo_root, clean_git_state
-):
+def test_squash_branch_passes_context_to_generator(squash_patches, mock_generator):
     """squash_branch() with context passes it to summarize_commit_history()."""
 
-    with (
-        patch("git_cai_cli.core.squash.find_git_root", return_value=mock_repo_root),
-        patch("subprocess.check_output", side_effect=clean_git_state),
-        patch(
-            "git_cai_cli.core.squash.load_config", return_value={"default": "openai"}
-        ),
-        patch("git_cai_cli.core.squash.load_token", return_value="token"),
-        patch(
-            "git_cai_cli.core.squash.CommitMessageGenerator",
-            return_value=mock_generator,
-        ),
-        patch("git_cai_cli.core.squash.get_git_editor", return_value="true"),
-        patch("git_cai_cli.core.squash.sha256_of_file", side_effect=["a", "b"]),
-        patch("subprocess.run", return_value=MagicMock(returncode=0)),
-        patch("git_cai_cli.core.squash._has_upstream", return_value=False),
-        patch("git_cai_cli.core.squash._has_commits", return_value=True),
-    ):
+    with patch("git_cai_cli.core.squash._has_commits", return_value=True):
         squash_branch(context="Closes #42")
 
     call_args = mock_generator.build_squash_request.call_args
@@ -504,48 +405,29 @@ def test_squash_branch_passes_context_to_generator(
 # ---------------------------------------------------------------------------
 
 
-def test_editor_launch_uses_argv_never_shell(
-    mock_repo_root, clean_git_state, mock_generator
-) -> None:
+def test_editor_launch_uses_argv_never_shell(squash_patches) -> None:
     """
     The editor must always be launched via argv list. Using shell=True is a
     code-injection vector if GIT_EDITOR carries shell metacharacters.
     """
-    run_mock = MagicMock(return_value=MagicMock(returncode=0))
-
-    with (
-        patch("git_cai_cli.core.squash.find_git_root", return_value=mock_repo_root),
-        patch("subprocess.check_output", side_effect=clean_git_state),
-        patch(
-            "git_cai_cli.core.squash.load_config", return_value={"default": "openai"}
-        ),
-        patch("git_cai_cli.core.squash.load_token", return_value="token"),
-        patch(
-            "git_cai_cli.core.squash.CommitMessageGenerator",
-            return_value=mock_generator,
-        ),
-        patch("git_cai_cli.core.squash.get_git_editor", return_value="true"),
-        patch("git_cai_cli.core.squash.sha256_of_file", side_effect=["a", "b"]),
-        patch("subprocess.run", run_mock),
-        patch("git_cai_cli.core.squash._has_upstream", return_value=False),
-    ):
-        squash_branch()
+    squash_branch()
 
-    for kwargs in (c.kwargs for c in run_mock.call_args_list):
+    run_calls = squash_patches.run.call_args_list
+    for kwargs in (c.kwargs for c in run_calls):
         assert (
             kwargs.get("shell", False) is False
         ), "subprocess.run was invoked with shell=True — security regression"
 
     editor_calls = [
         c
-        for c in run_mock.call_args_list
+        for c in run_calls
         if c.args and isinstance(c.args[0], list) and c.args[0][0] == "true"
     ]
     assert editor_calls, "expected an argv-form call for the editor invocation"
 
 
 def test_editor_with_shell_metacharacters_is_not_expanded(
-    mock_repo_root, clean_git_state, mock_generator, tmp_path
+    squash_patches, tmp_path
 ) -> None:
     """
     A malicious GIT_EDITOR like 'true; rm -rf /' must be parsed by shlex
@@ -553,67 +435,30 @@ def test_editor_with_shell_metacharacters_is_not_expanded(
     passed as a single argv[0] — never expanded by a shell.
     """
     canary = tmp_path / "should-not-exist.txt"
-    malicious = f"true; touch {canary}"
+    squash_patches.get_git_editor.return_value = f"true; touch {canary}"
 
-    run_mock = MagicMock(return_value=MagicMock(returncode=0))
-
-    with (
-        patch("git_cai_cli.core.squash.find_git_root", return_value=mock_repo_root),
-        patch("subprocess.check_output", side_effect=clean_git_state),
-        patch(
-            "git_cai_cli.core.squash.load_config", return_value={"default": "openai"}
-        ),
-        patch("git_cai_cli.core.squash.load_token", return_value="token"),
-        patch(
-            "git_cai_cli.core.squash.CommitMessageGenerator",
-            return_value=mock_generator,
-        ),
-        patch("git_cai_cli.core.squash.get_git_editor", return_value=malicious),
-        patch("git_cai_cli.core.squash.sha256_of_file", side_effect=["a", "b"]),
-        patch("subprocess.run", run_mock),
-        patch("git_cai_cli.core.squash._has_upstream", return_value=False),
-    ):
-        squash_branch()
+    squash_branch()
 
-    for kwargs in (c.kwargs for c in run_mock.call_args_list):
+    for kwargs in (c.kwargs for c in squash_patches.run.call_args_list):
         assert kwargs.get("shell", False) is False
     assert (
         not canary.exists()
     ), "shell metacharacters in GIT_EDITOR were expanded — injection vector"
 
 
-def test_editor_not_on_path_aborts_cleanly(
-    mock_repo_root, clean_git_state, mock_generator, caplog
-) -> None:
+def test_editor_not_on_path_aborts_cleanly(squash_patches, caplog) -> None:
     """
     If the editor binary isn't on PATH, the squash flow logs a clear error
     and returns — no fallback to shell=True.
     """
-    run_mock = MagicMock(return_value=MagicMock(returncode=0))
+    squash_patches.get_git_editor.return_value = "/nonexistent/editor-xyz"
+    squash_patches.sha256_of_file.side_effect = None
+    squash_patches.sha256_of_file.return_value = "hash"
 
-    with (
-        patch("git_cai_cli.core.squash.find_git_root", return_value=mock_repo_root),
-        patch("subprocess.check_output", side_effect=clean_git_state),
-        patch(
-            "git_cai_cli.core.squash.load_config", return_value={"default": "openai"}
-        ),
-        patch("git_cai_cli.core.squash.load_token", return_value="token"),
-        patch(
-            "git_cai_cli.core.squash.CommitMessageGenerator",
-            return_value=mock_generator,
-        ),
-        patch(
-            "git_cai_cli.core.squash.get_git_editor",
-            return_value="/nonexistent/editor-xyz",
-        ),
-        patch("git_cai_cli.core.squash.sha256_of_file", return_value="hash"),
-        patch("subprocess.run", run_mock),
-        patch("git_cai_cli.core.squash._has_upstream", return_value=False),
-    ):
-        squash_branch()
+    squash_branch()
 
     assert "not found in PATH" in caplog.text
-    for kwargs in (c.kwargs for c in run_mock.call_args_list):
+    for kwargs in (c.kwargs for c in squash_patches.run.call_args_list):
         assert kwargs.get("shell", False) is False
 
 
@@ -622,18 +467,13 @@ def test_editor_not_on_path_aborts_cleanly(
 # ---------------------------------------------------------------------------
 
 
-def test_shallow_clone_aborts_with_clear_message(mock_repo_root, caplog) -> None:
+def test_shallow_clone_aborts_with_clear_message(squash_patches, caplog) -> None:
     """A shallow clone must be detected and surfaced clearly so the user
     isn't left guessing why HEAD~N or merge-base failed."""
-    with (
-        patch("git_cai_cli.core.squash.find_git_root", return_value=mock_repo_root),
-        patch("subprocess.check_output", return_value="true"),
-        patch(
-            "git_cai_cli.core.squash.load_config", return_value={"default": "openai"}
-        ),
-        patch("git_cai_cli.core.squash.load_token", return_value="token"),
-    ):
-        squash_branch()
+    squash_patches.check_output.side_effect = None
+    squash_patches.check_output.return_value = "true"
+
+    squash_branch()
 
     assert "shallow clone" in caplog.text.lower()
     assert "git fetch --unshallow" in caplog.text
@@ -645,42 +485,20 @@ def test_shallow_clone_aborts_with_clear_message(mock_repo_root, caplog) -> None
 
 
 def test_cancel_after_staged_commit_surfaces_rollback_instructions(
-    mock_repo_root, mock_generator, caplog
+    squash_patches, caplog
 ) -> None:
     """If the user has staged changes that get committed before the squash
     summary editor is opened, and they then cancel the editor, we must
     point them at `git reset HEAD~1 --soft` so they can recover."""
 
-    def git_side_effect(cmd, text=True, **kwargs) -> str:
-        if cmd[:3] == ["git", "rev-parse", "--is-shallow-repository"]:
-            return "false"
-        if cmd[:3] == ["git", "diff", "--cached"]:
-            return "file.py"
-        if cmd[:2] == ["git", "diff"]:
-            return ""
-        if cmd[:2] == ["git", "--no-pager"] and "log" in cmd:
-            return "commit 1\ncommit 2"
-        if "merge-base" in cmd:
-            return "BASE"
-        if "symbolic-ref" in cmd:
-            return "refs/remotes/origin/main"
-        raise AssertionError(f"Unexpected git command: {cmd}")
-
     caplog.set_level("WARNING")
+    squash_patches.check_output.side_effect = _fake_git(
+        {**_CLEAN_WORKTREE, **_BRANCH_BASE, _STAGED_KEY: "file.py"}
+    )
 
     with (
-        patch("git_cai_cli.core.squash.find_git_root", return_value=mock_repo_root),
         patch("git_cai_cli.core.squash.git_diff_excluding", return_value="diff"),
-        patch("subprocess.check_output", side_effect=git_side_effect),
         patch("git_cai_cli.core.squash.commit_with_edit_template", return_value=1),
-        patch(
-            "git_cai_cli.core.squash.load_config", return_value={"default": "openai"}
-        ),
-        patch("git_cai_cli.core.squash.load_token", return_value="token"),
-        patch(
-            "git_cai_cli.core.squash.CommitMessageGenerator",
-            return_value=mock_generator,
-        ),
     ):
         squash_branch()
 
@@ -1,8 +1,11 @@
+import re
+from types import MappingProxyType
 from unittest.mock import MagicMock
 
 import pytest
 import requests
 from git_cai_cli.core.validate import (
+    ALLOWED_STYLES,
     _validate_config_keys,
     _validate_language,
     _validate_llm_call,
@@ -30,20 +33,40 @@ def _make_http_error(status: int, body: dict | str | None) -> requests.HTTPError
     return err
 
 
-def test_validate_config_keys_valid_minimal(caplog):
-    caplog.set_level("WARNING")
+def _missing_keys_message(caplog) -> str:
+    """Return the "Config does not define: ..." info message; fail if absent."""
+    missing = [
+        r.getMessage()
+        for r in caplog.records
+        if r.getMessage().startswith("Config does not define:")
+    ]
+    assert missing, "expected a 'Config does not define' info message"
+    return missing[0]
 
-    reference = {
-        "openai": {},
-        "gemini": {},
-        "language": "en",
-        "default": "openai",
-        "style": "professional",
-        "emoji": True,
-        "load_tokens_from": "/path/to/tokens.yml",
-        "prompt_file": "",
-        "squash_prompt_file": "",
-    }
+
+@pytest.fixture(scope="module")
+def reference():
+    """
+    Read-only reference config shared by the _validate_config_keys tests.
+    The validator only derives the provider names from it; global keys
+    come from ALLOWED_GLOBAL_KEYS.
+    """
+    return MappingProxyType(
+        {
+            "openai": {},
+            "gemini": {},
+            "anthropic": {},
+            "ollama": {},
+            "language": "en",
+            "default": "openai",
+            "style": "professional",
+            "emoji": True,
+        }
+    )
+
+
+def test_validate_config_keys_valid_minimal(caplog, reference):
+    caplog.set_level("WARNING")
 
     config = {
         "openai": {"model": "gpt", "temperature": 0},
@@ -59,63 +82,59 @@ def test_validate_config_keys_valid_minimal(caplog):
     _validate_config_keys(config, reference)
 
     # No warnings or errors
-    assert caplog.text == ""
-
+    assert not caplog.records
 
-def test_validate_config_keys_unknown_key():
-    reference = {
-        "openai": {},
-        "language": "en",
-        "default": "openai",
-    }
-
-    config = {
-        "openai": {"model": "gpt", "temperature": 0},
-        "language": "en",
-        "default": "openai",
-        "unknown": 123,
-    }
 
-    with pytest.raises(KeyError) as exc:
+@pytest.mark.parametrize(
+    "config, msg",
+    [
+        (
+            {
+                "openai": {"model": "gpt", "temperature": 0},
+                "language": "en",
+                "default": "openai",
+                "unknown": 123,
+            },
+            "Unknown config keys: unknown",
+        ),
+        (
+            {"language": "en", "default": "openai"},
+            "At least one provider configuration must be defined",
+        ),
+        (
+            {"openai": "not-a-dict", "language": "en"},
+            "Provider 'openai' must be a mapping",
+        ),
+        (
+            {"openai": {"temperature": 0}, "language": "en"},
+            "missing required keys: model",
+        ),
+    ],
+    ids=["unknown_key", "no_providers", "not_mapping", "missing_fields"],
+)
+def test_validate_config_keys_raises(reference, config, msg):
+    with pytest.raises(KeyError, match=re.escape(msg)):
         _validate_config_keys(config, reference)
 
-    assert "Unknown config keys: unknown" in str(exc.value)
-
 
-def test_validate_config_keys_missing_globals_info(caplog):
+def test_validate_config_keys_missing_globals_info(caplog, reference):
     caplog.set_level("INFO")
 
-    reference = {
-        "openai": {},
-        "language": "en",
-        "default": "openai",
-        "style": "professional",
-        "emoji": True,
-    }
-
     config = {
         "openai": {"model": "gpt", "temperature": 0},
     }
 
     _validate_config_keys(config, reference)
 
-    assert "Config does not define:" in caplog.text
-    assert "Global or default values will be used" in caplog.text
+    assert "Global or default values will be used" in _missing_keys_message(caplog)
 
 
-def test_validate_config_keys_does_not_complain_about_stats_db_path(caplog):
+def test_validate_config_keys_does_not_complain_about_stats_db_path(caplog, reference):
     """``stats_db_path`` is an internal escape-hatch — accepted if set
     but never reported as "missing" since users aren't expected to
     define it (the default DB path is always the same)."""
     caplog.set_level("INFO")
 
-    reference = {
-        "openai": {},
-        "language": "en",
-        "default": "openai",
-        "style": "professional",
-        "emoji": True,
-    }
     # Define every documented top-level key so the only thing absent
     # from the validator's set is ``stats_db_path``.
     config = {
@@ -142,21 +161,14 @@ def test_validate_config_keys_does_not_complain_about_stats_db_path(caplog):
 
     _validate_config_keys(config, reference)
 
-    assert "stats_db_path" not in caplog.text
+    assert not any("stats_db_path" in r.getMessage() for r in caplog.records)
 
 
-def test_validate_config_keys_accepts_stats_db_path_when_set(caplog):
+def test_validate_config_keys_accepts_stats_db_path_when_set(caplog, reference):
     """Setting ``stats_db_path`` is still allowed (e.g. tests use it) —
     it must not be rejected as an unknown key."""
     caplog.set_level("INFO")
 
-    reference = {
-        "openai": {},
-        "language": "en",
-        "default": "openai",
-        "style": "professional",
-        "emoji": True,
-    }
     config = {
         "openai": {"model": "gpt", "temperature": 0},
         "stats_db_path": "/tmp/x.db",
@@ -165,66 +177,8 @@ def test_validate_config_keys_accepts_stats_db_path_when_set(caplog):
     _validate_config_keys(config, reference)  # must not raise
 
 
-def test_validate_config_keys_no_providers():
-    reference = {
-        "openai": {},
-        "gemini": {},
-        "language": "en",
-    }
-
-    config = {
-        "language": "en",
-        "default": "openai",
-    }
-
-    with pytest.raises(KeyError) as exc:
-        _validate_config_keys(config, reference)
-
-    assert "At least one provider configuration must be defined" in str(exc.value)
-
-
-def test_validate_config_keys_provider_not_mapping():
-    reference = {
-        "openai": {},
-        "language": "en",
-    }
-
-    config = {
-        "openai": "not-a-dict",
-        "language": "en",
-    }
-
-    with pytest.raises(KeyError) as exc:
-        _validate_config_keys(config, reference)
-
-    assert "Provider 'openai' must be a mapping" in str(exc.value)
-
-
-def test_validate_config_keys_provider_missing_fields():
-    reference = {
-        "openai": {},
-        "language": "en",
-    }
-
-    config = {
-        "openai": {"temperature": 0},
-        "language": "en",
-    }
-
-    with pytest.raises(KeyError) as exc:
-        _validate_config_keys(config, reference)
-
-    assert "missing required keys: model" in str(exc.value)
-
-
-def test_provider_block_without_temperature_is_valid():
+def test_provider_block_without_temperature_is_valid(reference):
     """``temperature`` is optional — a provider block only needs 'model'."""
-    reference = {
-        "openai": {},
-        "language": "en",
-        "default": "openai",
-    }
-
     config = {
         "default": "openai",
         "language": "en",
@@ -235,103 +189,73 @@ def test_provider_block_without_temperature_is_valid():
     _validate_config_keys(config, reference)
 
 
-def test_validate_language_valid(caplog):
-    result = _validate_language({"language": "de"}, {"en", "de", "fr"})
-    assert result == "de"
-    assert caplog.text == ""
+SUPPORTED_LANGS = frozenset({"en", "de", "fr"})
+_EN_DE = SUPPORTED_LANGS - {"fr"}
+_DE_ONLY = frozenset({"de"})
 
 
-def test_validate_language_invalid_fallback(caplog):
-    caplog.set_level("WARNING")
-
-    result = _validate_language({"language": "xx"}, {"en", "de"})
-    assert result == "en"
-    assert "not supported" in caplog.text
-
-
-def test_validate_language_invalid_fallback_respects_allowed_set(caplog):
-    caplog.set_level("WARNING")
-
-    result = _validate_language({"language": "xx"}, {"de"})
-    assert result == "de"
-    assert "not supported" in caplog.text
-
-
-def test_validate_language_missing_fallback(caplog):
+@pytest.mark.parametrize(
+    "cfg, allowed, expected, warn",
+    [
+        ({"language": "de"}, SUPPORTED_LANGS, "de", False),
+        ({"language": "xx"}, _EN_DE, "en", True),
+        ({"language": "xx"}, _DE_ONLY, "de", True),
+        ({}, _EN_DE, "en", True),
+        ({}, _DE_ONLY, "de", True),
+    ],
+    ids=[
+        "valid",
+        "invalid_fallback",
+        "invalid_fallback_respects_allowed_set",
+        "missing_fallback",
+        "missing_fallback_respects_allowed_set",
+    ],
+)
+def test_validate_language(cfg, allowed, expected, warn, caplog):
     caplog.set_level("WARNING")
 
-    result = _validate_language({}, {"en", "de"})
-    assert result == "en"
-    assert "not supported" in caplog.text
+    assert _validate_language(cfg, allowed) == expected
+    assert any("not supported" in r.getMessage() for r in caplog.records) == warn
 
 
-def test_validate_language_missing_fallback_respects_allowed_set(caplog):
-    caplog.set_level("WARNING")
-
-    result = _validate_language({}, {"de"})
-    assert result == "de"
-    assert "not supported" in caplog.text
+@pytest.mark.parametrize("style", sorted(ALLOWED_STYLES))
+def test_validate_style_accepts(style):
+    assert _validate_style(style) == style
 
 
 @pytest.mark.parametrize(
     "style",
-    [
-        "professional",
-        " neutral ",
-        "Friendly",
-        "FUNNY",
-        "excited",
-        "sarcastic",
-        "apologetic",
-        "academic",
-    ],
+    [" neutral ", "Friendly", "FUNNY"],
+    ids=["padded", "title_case", "upper_case"],
 )
-def test_validate_style_accepts(style):
-    result = _validate_style(style)
-    assert isinstance(result, str)
+def test_validate_style_normalizes_case_and_whitespace(style):
+    assert _validate_style(style) == style.strip().lower()
 
 
 def test_validate_style_invalid_value():
-    with pytest.raises(ValueError) as exc:
+    with pytest.raises(ValueError, match="Invalid style"):
         _validate_style("angry")
 
-    assert "Invalid style" in str(exc.value)
-
 
 def test_validate_style_none_is_allowed():
     assert _validate_style(None) == "none"
 
 
-@pytest.mark.parametrize("style", ["", 123])
+@pytest.mark.parametrize("style", ["", 123], ids=["empty", "int"])
 def test_validate_style_invalid_type(style):
-    with pytest.raises(ValueError) as exc:
+    with pytest.raises(ValueError, match="Style must be a non-empty string"):
         _validate_style(style)  # type: ignore[arg-type]
 
-    assert "Style must be a non-empty string" in str(exc.value)
-
 
 # -------------------------------------------
 # Tests for new config keys (token_logging, measure_time)
 # -------------------------------------------
 
 
-def test_new_config_keys_accepted_by_validator(caplog):
+def test_new_config_keys_accepted_by_validator(caplog, reference):
     """Verify token_logging and measure_time are accepted as valid global keys."""
     caplog.set_level("WARNING")
 
-    reference = {
-        "openai": {},
-        "language": "en",
-        "default": "openai",
-        "style": "professional",
-        "emoji": True,
-        "load_tokens_from": "/path/to/tokens.yml",
-        "prompt_file": "",
-        "squash_prompt_file": "",
-        "token_logging": True,
-        "measure_time": False,
-    }
-
     config = {
         "openai": {"model": "gpt", "temperature": 0},
         "language": "en",
@@ -348,27 +272,13 @@ def test_new_config_keys_accepted_by_validator(caplog):
     _validate_config_keys(config, reference)
 
     # No warnings or errors
-    assert caplog.text == ""
+    assert not caplog.records
 
 
-def test_branch_context_accepted_by_validator(caplog):
+def test_branch_context_accepted_by_validator(caplog, reference):
     """Verify branch_context is accepted as a valid global config key."""
     caplog.set_level("WARNING")
 
-    reference = {
-        "openai": {},
-        "language": "en",
-        "default": "openai",
-        "style": "professional",
-        "emoji": True,
-        "load_tokens_from": "/path/to/tokens.yml",
-        "prompt_file": "",
-        "squash_prompt_file": "",
-        "token_logging": True,
-        "measure_time": False,
-        "branch_context": False,
-    }
-
     config = {
         "openai": {"model": "gpt", "temperature": 0},
         "language": "en",
@@ -380,26 +290,13 @@ def test_branch_context_accepted_by_validator(caplog):
 
     _validate_config_keys(config, reference)
 
-    assert caplog.text == ""
+    assert not caplog.records
 
 
-def test_missing_new_config_keys_non_fatal(caplog):
+def test_missing_new_config_keys_non_fatal(caplog, reference):
     """Verify missing token_logging/measure_time keys are non-fatal (backward compat)."""
     caplog.set_level("INFO")
 
-    reference = {
-        "openai": {},
-        "language": "en",
-        "default": "openai",
-        "style": "professional",
-        "emoji": True,
-        "load_tokens_from": "/path",
-        "prompt_file": "",
-        "squash_prompt_file": "",
-        "token_logging": True,
-        "measure_time": False,
-    }
-
     # Config WITHOUT the new keys — simulates old config file
     config = {
         "openai": {"model": "gpt", "temperature": 0},
@@ -416,9 +313,9 @@ def test_missing_new_config_keys_non_fatal(caplog):
     _validate_config_keys(config, reference)
 
     # Should log info about missing keys
-    assert "Config does not define:" in caplog.text
-    assert "measure_time" in caplog.text
-    assert "token_logging" in caplog.text
+    missing = _missing_keys_message(caplog)
+    assert "measure_time" in missing
+    assert "token_logging" in missing
 
 
 # -------------------------------------------
@@ -427,23 +324,10 @@ def test_missing_new_config_keys_non_fatal(caplog):
 # -------------------------------------------
 
 
-def test_timeout_and_full_files_accepted_by_validator(caplog):
+def test_timeout_and_full_files_accepted_by_validator(caplog, reference):
     """timeout and full_files are accepted as valid global keys."""
     caplog.set_level("WARNING")
 
-    reference = {
-        "openai": {},
-        "language": "en",
-        "default": "openai",
-        "style": "professional",
-        "emoji": True,
-        "load_tokens_from": "/path",
-        "prompt_file": "",
-        "squash_prompt_file": "",
-        "timeout": 30,
-        "full_files": False,
-    }
-
     config = {
         "openai": {"model": "gpt", "temperature": 0},
         "language": "en",
@@ -458,21 +342,13 @@ def test_timeout_and_full_files_accepted_by_validator(caplog):
     }
 
     _validate_config_keys(config, reference)
-    assert caplog.text == ""
+    assert not caplog.records
 
 
-def test_anthropic_max_tokens_subkey_accepted(caplog):
+def test_anthropic_max_tokens_subkey_accepted(caplog, reference):
     """Extra provider subkeys like anthropic.max_tokens are tolerated."""
     caplog.set_level("WARNING")
 
-    reference = {
-        "anthropic": {},
-        "language": "en",
-        "default": "anthropic",
-        "style": "professional",
-        "emoji": True,
-    }
-
     config = {
         "anthropic": {
             "model": "claude",
@@ -486,21 +362,13 @@ def test_anthropic_max_tokens_subkey_accepted(caplog):
     }
 
     _validate_config_keys(config, reference)
-    assert caplog.text == ""
+    assert not caplog.records
 
 
-def test_ollama_timeout_subkey_accepted(caplog):
+def test_ollama_timeout_subkey_accepted(caplog, reference):
     """Extra provider subkeys like ollama.timeout are tolerated."""
     caplog.set_level("WARNING")
 
-    reference = {
-        "ollama": {},
-        "language": "en",
-        "default": "ollama",
-        "style": "professional",
-        "emoji": True,
-    }
-
     config = {
         "ollama": {
             "model": "llama3.1",
@@ -514,26 +382,13 @@ def test_ollama_timeout_subkey_accepted(caplog):
     }
 
     _validate_config_keys(config, reference)
-    assert caplog.text == ""
+    assert not caplog.records
 
 
-def test_old_config_missing_timeout_and_full_files_loads_cleanly(caplog):
+def test_old_config_missing_timeout_and_full_files_loads_cleanly(caplog, reference):
     """Old configs without timeout/full_files keys must not raise."""
     caplog.set_level("INFO")
 
-    reference = {
-        "openai": {},
-        "language": "en",
-        "default": "openai",
-        "style": "professional",
-        "emoji": True,
-        "load_tokens_from": "/path",
-        "prompt_file": "",
-        "squash_prompt_file": "",
-        "timeout": 30,
-        "full_files": False,
-    }
-
     # Old-style config without the new keys
     config = {
         "openai": {"model": "gpt", "temperature": 0},
@@ -548,8 +403,9 @@ def test_old_config_missing_timeout_and_full_files_loads_cleanly(caplog):
 
     _validate_config_keys(config, reference)
 
-    assert "timeout" in caplog.text
-    assert "full_files" in caplog.text
+    missing = _missing_keys_message(caplog)
+    assert "timeout" in missing
+    assert "full_files" in missing
 
 
 # ---------------------------------------------------------------------------
@@ -646,11 +502,9 @@ def test_validate_llm_call_handles_non_json_body():
     def fn():
         raise err
 
-    with pytest.raises(ValueError) as exc_info:
+    with pytest.raises(ValueError, match="502"):
         _validate_llm_call(fn, token="t")
 
-    assert "502" in str(exc_info.value)
-
 
 def test_validate_llm_call_unrelated_exception_propagates():
     """Non-HTTP errors must propagate (preserves stack for debug)."""